@@ -1,19 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
 from accounts.models import Token, User
 
 
+class KnownUsers(object):
+    """Bounded, process-local LRU set of emails known to have a User row.
+
+    User is nothing but its email primary key, so once a row is known to
+    exist the instance can be rebuilt without asking the database.
+
+    Deletes only reach the process that made them, through post_delete,
+    so entries also expire after settings.AUTH_USER_CACHE_TTL seconds to
+    bound how long other workers go on trusting a deleted user.
+    """
+
+    def __init__(self):
+        self._emails = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, email):
+        with self._lock:
+            expires = self._emails.get(email)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self._emails[email]
+                return False
+            self._emails.move_to_end(email)
+            return True
+
+    def add(self, email):
+        size = settings.AUTH_USER_CACHE_SIZE
+        if not size:
+            return
+        expires = time.monotonic() + settings.AUTH_USER_CACHE_TTL
+        with self._lock:
+            self._emails[email] = expires
+            self._emails.move_to_end(email)
+            while len(self._emails) > size:
+                self._emails.popitem(last=False)
+
+    def discard(self, email):
+        with self._lock:
+            self._emails.pop(email, None)
+
+    def clear(self):
+        with self._lock:
+            self._emails.clear()
+
+
+known_users = KnownUsers()
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user(sender, instance, **kwargs):
+    known_users.discard(instance.email)
+
+
+def _existing_user(email):
+    user = User(email=email)
+    user._state.adding = False
+    user._state.db = User.objects.db
+    return user
+
+
 class PasswordlessAuthenticationBackend(object):
 
     def authenticate(self, uid):
+        cutoff = timezone.now() - timedelta(seconds=settings.LOGIN_TOKEN_MAX_AGE)
+        try:
+            token = Token.objects.get(uid=uid, created__gte=cutoff)
+        except Token.DoesNotExist:
+            return None
+        # Tokens are single use: a second click on the same link fails.
+        if not Token.objects.filter(pk=token.pk).delete()[0]:
+            return None
         try:
-            token = Token.objects.get(uid=uid)
             return User.objects.get(email=token.email)
         except User.DoesNotExist:
             return User.objects.create(email=token.email)
-        except Token.DoesNotExist:
-            return None
 
     def get_user(self, email):
+        if email in known_users:
+            return _existing_user(email)
         try:
-            return User.objects.get(email=email)
+            user = User.objects.get(email=email)
         except User.DoesNotExist:
-            return None
\ No newline at end of file
+            return None
+        known_users.add(email)
+        return user
@@ -0,0 +1,35 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from accounts.models import Token
+
+
+def purge_expired_tokens(batch_size=500, pause=0):
+    """Delete expired tokens a batch at a time so no single DELETE holds
+    the database lock long enough to stall logins."""
+    cutoff = timezone.now() - timedelta(seconds=settings.LOGIN_TOKEN_MAX_AGE)
+    deleted = 0
+    while True:
+        ids = list(Token.objects.filter(created__lt=cutoff).order_by(
+        ).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += Token.objects.filter(pk__in=ids).delete()[0]
+        if pause:
+            time.sleep(pause)
+
+
+class Command(BaseCommand):
+    help = 'Delete expired login tokens in small batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to sleep between batches.')
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_tokens(options['batch_size'], options['pause'])
+        self.stdout.write(f'deleted {deleted} expired tokens')
@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from accounts.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails from the outbox, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once no due emails remain instead of polling.')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help='Seconds to wait between polls when the outbox is empty.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_batch(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'sent {sent}, failed {failed}')
+            if not sent:
+                # Nothing due, or the whole batch failed (most likely on
+                # connect) and was rescheduled: back off before polling.
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
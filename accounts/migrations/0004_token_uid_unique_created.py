@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.21 on 2026-10-18 06:51
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='token',
+            name='created',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='token',
+            name='uid',
+            field=models.CharField(default=uuid.uuid4, max_length=40, unique=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib import auth
+from django.utils import timezone
 import uuid
 # Create your models here.
 
@@ -14,4 +15,21 @@ class User(models.Model):
 
 class Token(models.Model):
     email = models.EmailField()
-    uid = models.CharField(default=uuid.uuid4, max_length=40)
+    uid = models.CharField(default=uuid.uuid4, max_length=40, unique=True)
+    created = models.DateTimeField(default=timezone.now, db_index=True)
+
+
+class OutgoingEmail(models.Model):
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.EmailField()
+    to = models.TextField()
+    created = models.DateTimeField(default=timezone.now)
+    next_attempt = models.DateTimeField(default=timezone.now, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    sent = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default='')
+
+    @property
+    def recipients(self):
+        return self.to.split(',')
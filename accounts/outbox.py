@@ -0,0 +1,73 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+from accounts.models import OutgoingEmail
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    """Store an email for the outbox worker instead of sending it inline."""
+    return OutgoingEmail.objects.create(
+        subject=subject, body=message, from_email=from_email,
+        to=','.join(recipient_list))
+
+
+def pending(now=None):
+    return OutgoingEmail.objects.filter(
+        sent__isnull=True,
+        attempts__lt=settings.OUTBOX_MAX_ATTEMPTS,
+        next_attempt__lte=now or timezone.now(),
+    ).order_by('next_attempt', 'id')
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(
+        settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.OUTBOX_MAX_RETRY_DELAY))
+
+
+def _failed(email, error, now):
+    email.attempts += 1
+    email.last_error = repr(error)
+    email.next_attempt = now + retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'next_attempt'])
+
+
+def send_batch(batch_size=None, connection=None):
+    """Send up to batch_size due emails over one SMTP connection.
+
+    Returns the number of emails sent and the number that failed and were
+    rescheduled with exponential backoff.
+    """
+    now = timezone.now()
+    batch = list(pending(now)[:batch_size or settings.OUTBOX_BATCH_SIZE])
+    if not batch:
+        return 0, 0
+
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in batch:
+            _failed(email, error, now)
+        return 0, len(batch)
+
+    sent = failed = 0
+    try:
+        for email in batch:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email,
+                email.recipients, connection=connection)
+            try:
+                connection.send_messages([message])
+            except Exception as error:
+                _failed(email, error, now)
+                failed += 1
+            else:
+                email.sent = timezone.now()
+                email.attempts += 1
+                email.save(update_fields=['sent', 'attempts'])
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
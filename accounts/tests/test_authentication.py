@@ -1,6 +1,11 @@
+from datetime import timedelta
+from unittest.mock import patch
 from django.test import TestCase
+from django.utils import timezone
 from django.contrib.auth import get_user_model
-from accounts.authentication import PasswordlessAuthenticationBackend
+from django.test import override_settings
+from accounts.authentication import (PasswordlessAuthenticationBackend,
+                                     known_users)
 from accounts.models import Token
 
 User = get_user_model()
@@ -27,9 +32,25 @@ class AuthenticateTest(TestCase):
         user = PasswordlessAuthenticationBackend().authenticate(token.uid)
         self.assertEqual(user, existing_user)
 
+    def test_token_can_only_be_used_once(self):
+        token = Token.objects.create(email='edith@example.com')
+        backend = PasswordlessAuthenticationBackend()
+        self.assertIsNotNone(backend.authenticate(token.uid))
+        self.assertIsNone(backend.authenticate(token.uid))
+
+    def test_returns_none_if_token_expired(self):
+        token = Token.objects.create(
+            email='edith@example.com',
+            created=timezone.now() - timedelta(days=1))
+        self.assertIsNone(
+            PasswordlessAuthenticationBackend().authenticate(token.uid))
+
 
 class GetUserTest(TestCase):
 
+    def setUp(self):
+        known_users.clear()
+
     def test_gets_user_by_email(self):
         User.objects.create(email='another@example.com')
         desired_user = User.objects.create(email="edith@example.com")
@@ -39,3 +60,49 @@ class GetUserTest(TestCase):
     def test_returns_none_if_user_not_exists(self):
         self.assertIsNone(PasswordlessAuthenticationBackend(
         ).get_user(email='does-not@exist.com'))
+
+    def test_known_user_is_returned_without_a_query(self):
+        User.objects.create(email='edith@example.com')
+        backend = PasswordlessAuthenticationBackend()
+        backend.get_user(email='edith@example.com')
+        with self.assertNumQueries(0):
+            user = backend.get_user(email='edith@example.com')
+        self.assertEqual(user, User.objects.get(email='edith@example.com'))
+
+    def test_deleted_user_is_forgotten(self):
+        user = User.objects.create(email='edith@example.com')
+        backend = PasswordlessAuthenticationBackend()
+        backend.get_user(email='edith@example.com')
+        user.delete()
+        self.assertIsNone(backend.get_user(email='edith@example.com'))
+
+    @override_settings(AUTH_USER_CACHE_TTL=60)
+    def test_entries_expire(self):
+        User.objects.create(email='edith@example.com')
+        backend = PasswordlessAuthenticationBackend()
+        with patch('accounts.authentication.time.monotonic', return_value=0):
+            backend.get_user(email='edith@example.com')
+        # As deleted by another process: no post_delete here.
+        User.objects.filter(email='edith@example.com')._raw_delete('default')
+        with patch('accounts.authentication.time.monotonic', return_value=59):
+            self.assertIsNotNone(backend.get_user(email='edith@example.com'))
+        with patch('accounts.authentication.time.monotonic', return_value=61):
+            self.assertIsNone(backend.get_user(email='edith@example.com'))
+
+    @override_settings(AUTH_USER_CACHE_SIZE=1)
+    def test_cache_is_bounded(self):
+        User.objects.create(email='a@example.com')
+        User.objects.create(email='b@example.com')
+        backend = PasswordlessAuthenticationBackend()
+        backend.get_user(email='a@example.com')
+        backend.get_user(email='b@example.com')
+        with self.assertNumQueries(1):
+            backend.get_user(email='a@example.com')
+
+    @override_settings(AUTH_USER_CACHE_SIZE=0)
+    def test_cache_can_be_disabled(self):
+        User.objects.create(email='edith@example.com')
+        backend = PasswordlessAuthenticationBackend()
+        backend.get_user(email='edith@example.com')
+        with self.assertNumQueries(1):
+            backend.get_user(email='edith@example.com')
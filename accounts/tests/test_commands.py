@@ -0,0 +1,19 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from accounts.models import Token
+
+
+class PurgeTokensTest(TestCase):
+
+    def test_deletes_only_expired_tokens(self):
+        old = timezone.now() - timedelta(days=1)
+        for _ in range(5):
+            Token.objects.create(email='old@example.com', created=old)
+        fresh = Token.objects.create(email='new@example.com')
+        out = StringIO()
+        call_command('purge_tokens', '--batch-size=2', stdout=out)
+        self.assertEqual(list(Token.objects.all()), [fresh])
+        self.assertIn('deleted 5', out.getvalue())
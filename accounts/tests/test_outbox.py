@@ -0,0 +1,86 @@
+from datetime import timedelta
+from io import StringIO
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from unittest.mock import Mock
+from accounts.models import OutgoingEmail
+from accounts.outbox import queue_mail, send_batch
+
+
+class SendBatchTest(TestCase):
+
+    def queue(self, n):
+        for i in range(n):
+            queue_mail('subject', f'body {i}', 'noreply@satno7.press',
+                       [f'user{i}@example.com'])
+
+    def test_sends_due_emails(self):
+        self.queue(2)
+        self.assertEqual(send_batch(), (2, 0))
+        self.assertEqual([m.to for m in mail.outbox],
+                         [['user0@example.com'], ['user1@example.com']])
+        self.assertFalse(OutgoingEmail.objects.filter(sent__isnull=True))
+
+    def test_does_not_resend_sent_emails(self):
+        self.queue(1)
+        send_batch()
+        self.assertEqual(send_batch(), (0, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_limits_batch_size(self):
+        self.queue(3)
+        self.assertEqual(send_batch(batch_size=2), (2, 0))
+        self.assertEqual(send_batch(batch_size=2), (1, 0))
+
+    def test_uses_one_connection_per_batch(self):
+        self.queue(3)
+        connection = Mock()
+        send_batch(connection=connection)
+        self.assertEqual(connection.open.call_count, 1)
+        self.assertEqual(connection.send_messages.call_count, 3)
+
+    @override_settings(OUTBOX_RETRY_DELAY=30)
+    def test_failed_email_is_retried_with_backoff(self):
+        self.queue(1)
+        connection = Mock()
+        connection.send_messages.side_effect = OSError('connection reset')
+        self.assertEqual(send_batch(connection=connection), (0, 1))
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('connection reset', email.last_error)
+        self.assertGreater(
+            email.next_attempt, timezone.now() + timedelta(seconds=25))
+        self.assertEqual(send_batch(), (0, 0))
+
+        OutgoingEmail.objects.update(next_attempt=timezone.now())
+        send_batch(connection=connection)
+        email.refresh_from_db()
+        self.assertGreater(
+            email.next_attempt, timezone.now() + timedelta(seconds=55))
+
+    def test_connection_failure_reschedules_whole_batch(self):
+        self.queue(2)
+        connection = Mock()
+        connection.open.side_effect = OSError('connection refused')
+        self.assertEqual(send_batch(connection=connection), (0, 2))
+        self.assertEqual(
+            OutgoingEmail.objects.filter(attempts=1).count(), 2)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=1)
+    def test_gives_up_after_max_attempts(self):
+        self.queue(1)
+        OutgoingEmail.objects.update(attempts=1)
+        self.assertEqual(send_batch(), (0, 0))
+
+
+class SendOutboxCommandTest(TestCase):
+
+    def test_once_sends_all_due_emails_and_exits(self):
+        for i in range(3):
+            queue_mail('subject', 'body', 'noreply@satno7.press',
+                       ['edith@example.com'])
+        call_command('send_outbox', '--once', '--batch-size=2',
+                     stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 3)
@@ -1,25 +1,31 @@
-from django.test import TestCase
+from django.conf import settings
+from django.core import mail
+from django.core.cache import caches
+from django.test import TestCase, override_settings
 import accounts.views
-from accounts.models import Token
+from accounts.models import OutgoingEmail, Token
 from unittest.mock import patch, call
 
 
 class SendLoginEmailViewTest(TestCase):
 
+    def setUp(self):
+        caches[settings.RATE_LIMIT_CACHE].clear()
+
     def test_redirects_to_home_page(self):
 
         response = self.client.post(
             '/accounts/send_login_email', data={'email': 'edith@example.com'})
         self.assertRedirects(response, '/')
 
-    @patch('accounts.views.send_mail')
-    def test_sends_mail_to_address_from_POST(self, mock_send_mail):
+    @patch('accounts.views.queue_mail')
+    def test_queues_mail_to_address_from_POST(self, mock_queue_mail):
 
         self.client.post(
             '/accounts/send_login_email', data={'email': 'edith@example.com'})
 
-        self.assertTrue(mock_send_mail.called)
-        (subject, body, from_email, to_list), kwargs = mock_send_mail.call_args
+        self.assertTrue(mock_queue_mail.called)
+        (subject, body, from_email, to_list), kwargs = mock_queue_mail.call_args
 
         self.assertEqual(subject, "Your login link for Superlists")
         self.assertEqual(from_email, "noreply@satno7.press")
@@ -41,16 +47,48 @@ class SendLoginEmailViewTest(TestCase):
         token = Token.objects.first()
         self.assertEqual(token.email, 'edith@example.com')
 
-    @patch('accounts.views.send_mail')
-    def test_sends_link_to_login_using_token_uid(self, mock_send_mail):
+    @patch('accounts.views.queue_mail')
+    def test_sends_link_to_login_using_token_uid(self, mock_queue_mail):
         self.client.post('/accounts/send_login_email',
                          data={'email': 'edith@example.com'})
 
         token = Token.objects.first()
         expected_url = f'http://testserver/accounts/login?token={token.uid}'
-        (subject, body, from_email, to_list), kwargs = mock_send_mail.call_args
+        (subject, body, from_email, to_list), kwargs = mock_queue_mail.call_args
         self.assertIn(expected_url, body)
 
+    @override_settings(RATE_LIMITS={'login_email': {'email': (2, 3600)}})
+    def test_rate_limits_requests_for_one_email(self):
+        for _ in range(2):
+            self.client.post('/accounts/send_login_email',
+                             data={'email': 'edith@example.com'})
+        response = self.client.post('/accounts/send_login_email',
+                                    data={'email': 'Edith@example.com '})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(Token.objects.count(), 2)
+        self.assertEqual(OutgoingEmail.objects.count(), 2)
+
+        response = self.client.post('/accounts/send_login_email',
+                                    data={'email': 'other@example.com'})
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(RATE_LIMITS={'login_email': {'ip': (1, 3600)}})
+    def test_rate_limits_requests_from_one_ip(self):
+        self.client.post('/accounts/send_login_email',
+                         data={'email': 'edith@example.com'})
+        response = self.client.post('/accounts/send_login_email',
+                                    data={'email': 'other@example.com'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '3600')
+
+    def test_does_not_send_mail_during_request(self):
+        self.client.post('/accounts/send_login_email',
+                         data={'email': 'edith@example.com'})
+
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.recipients, ['edith@example.com'])
+
 
 @patch('accounts.views.auth')
 class LoginViewTest(TestCase):
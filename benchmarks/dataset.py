@@ -0,0 +1,130 @@
+"""Bulk synthetic data for reproducing scaling problems locally."""
+import random
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Max
+
+from lists.models import Item, List
+
+User = get_user_model()
+
+WORDS = (
+    'buy', 'milk', 'eggs', 'bread', 'call', 'mum', 'book', 'flights', 'fix',
+    'bike', 'water', 'plants', 'pay', 'rent', 'email', 'boss', 'clean',
+    'kitchen', 'walk', 'dog', 'read', 'paper', 'write', 'tests', 'review',
+    'code', 'peacock', 'feathers', 'fishing', 'net', 'dentist', 'taxes',
+    'garden', 'paint', 'fence', 'laundry', 'groceries', 'birthday', 'gift',
+    'train', 'tickets', 'gym', 'library', 'return', 'parcel', 'oil', 'car',
+)
+
+
+class Distribution(object):
+    """A count drawn per list or per owner, parsed from specs such as
+    ``fixed:5``, ``uniform:1:20``, ``exponential:8`` or ``pareto:1.2:5000``
+    (heavy tailed, capped at the second number)."""
+
+    def __init__(self, spec):
+        kind, *args = spec.split(':')
+        try:
+            args = [float(arg) for arg in args]
+        except ValueError:
+            raise ValueError(f'Bad distribution {spec!r}')
+        expected = {'fixed': 1, 'uniform': 2, 'exponential': 1, 'pareto': 2}
+        if expected.get(kind) != len(args):
+            raise ValueError(f'Bad distribution {spec!r}')
+        self.spec = spec
+        self.kind = kind
+        self.args = args
+
+    def sample(self, rng):
+        if self.kind == 'fixed':
+            return int(self.args[0])
+        if self.kind == 'uniform':
+            return rng.randint(int(self.args[0]), int(self.args[1]))
+        if self.kind == 'exponential':
+            return int(rng.expovariate(1 / self.args[0]))
+        alpha, cap = self.args
+        return min(int(rng.paretovariate(alpha)), int(cap))
+
+    def __repr__(self):
+        return f'Distribution({self.spec!r})'
+
+
+class Generator(object):
+
+    def __init__(self, users, lists_per_owner, items_per_list,
+                 sharees_per_list, batch_size=10000, seed=0, prefix='gen',
+                 progress=None):
+        self.user_count = users
+        self.lists_per_owner = lists_per_owner
+        self.items_per_list = items_per_list
+        self.sharees_per_list = sharees_per_list
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.progress = progress or (lambda totals, elapsed: None)
+        self.totals = {'users': 0, 'lists': 0, 'items': 0, 'shares': 0}
+        self._reset_buffers()
+
+    def _reset_buffers(self):
+        self.lists, self.items, self.shares = [], [], []
+
+    def run(self):
+        self.started = time.perf_counter()
+        emails = [f'{self.prefix}-{n}@example.com'
+                  for n in range(self.user_count)]
+        for start in range(0, len(emails), self.batch_size):
+            with transaction.atomic():
+                User.objects.bulk_create(
+                    User(email=email)
+                    for email in emails[start:start + self.batch_size])
+        self.totals['users'] = len(emails)
+
+        next_id = (List.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        Share = List.shared_with.through
+        for owner in emails:
+            for _ in range(self.lists_per_owner.sample(self.rng)):
+                texts = self._item_texts(
+                    max(1, self.items_per_list.sample(self.rng)))
+                self.lists.append(List(
+                    id=next_id, owner_id=owner, title=texts[0],
+                    item_count=len(texts), version=uuid.uuid4()))
+                self.items.extend(
+                    Item(list_id=next_id, text=text) for text in texts)
+                sharees = min(self.sharees_per_list.sample(self.rng),
+                              len(emails) - 1)
+                self.shares.extend(self._shares(Share, next_id, owner, emails,
+                                                sharees))
+                next_id += 1
+                if len(self.items) >= self.batch_size:
+                    self._flush()
+        self._flush()
+        return self.totals
+
+    def _shares(self, Share, list_id, owner, emails, count):
+        picked = [email for email in self.rng.sample(emails, count + 1)
+                  if email != owner][:count]
+        return [Share(list_id=list_id, user_id=email) for email in picked]
+
+    def _item_texts(self, count):
+        texts = []
+        for n in range(count):
+            words = self.rng.sample(WORDS, self.rng.randint(1, 3))
+            texts.append(f"{' '.join(words)} {n + 1}")
+        return texts
+
+    def _flush(self):
+        if not self.lists and not self.items:
+            return
+        with transaction.atomic():
+            List.objects.bulk_create(self.lists)
+            Item.objects.bulk_create(self.items)
+            List.shared_with.through.objects.bulk_create(self.shares)
+        self.totals['lists'] += len(self.lists)
+        self.totals['items'] += len(self.items)
+        self.totals['shares'] += len(self.shares)
+        self._reset_buffers()
+        self.progress(self.totals, time.perf_counter() - self.started)
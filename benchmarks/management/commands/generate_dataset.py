@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.dataset import Distribution, Generator
+
+
+def distribution(spec):
+    try:
+        return Distribution(spec)
+    except ValueError as error:
+        raise CommandError(str(error))
+
+
+class Command(BaseCommand):
+    help = ('Generate users, lists, items and shares with bulk inserts, '
+            'one transaction per batch.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument(
+            '--lists-per-owner', type=distribution,
+            default=Distribution('exponential:5'),
+            help='fixed:N, uniform:A:B, exponential:MEAN or pareto:ALPHA:MAX')
+        parser.add_argument(
+            '--items-per-list', type=distribution,
+            default=Distribution('pareto:1.2:5000'))
+        parser.add_argument(
+            '--sharees-per-list', type=distribution,
+            default=Distribution('exponential:1'))
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix', default='gen',
+            help='Users are named <prefix>-<n>@example.com; use a new prefix '
+                 'to add more users to an existing dataset.')
+
+    def handle(self, *args, **options):
+        generator = Generator(
+            users=options['users'],
+            lists_per_owner=options['lists_per_owner'],
+            items_per_list=options['items_per_list'],
+            sharees_per_list=options['sharees_per_list'],
+            batch_size=options['batch_size'], seed=options['seed'],
+            prefix=options['prefix'], progress=self.progress)
+        totals = generator.run()
+        self.stdout.write(
+            'created {users} users, {lists} lists, {items} items, '
+            '{shares} shares'.format(**totals))
+
+    def progress(self, totals, elapsed):
+        self.stdout.write(
+            f"{totals['lists']} lists, {totals['items']} items in "
+            f"{elapsed:.1f}s ({totals['items'] / elapsed:.0f} items/s)")
@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Boot the app in a fresh interpreter as a gunicorn worker would '
+            'and report startup phases, warm-up steps, first request times '
+            'and the slowest imports.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=25,
+            help='Number of modules to list, slowest cumulative first.')
+        parser.add_argument(
+            '--no-warm-up', action='store_true',
+            help='Boot without the warm-up step, to measure what it saves.')
+        parser.add_argument(
+            '--json', metavar='PATH',
+            help='Also write the raw measurements to PATH.')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env['DJANGO_SETTINGS_MODULE'] = os.environ.get(
+            'DJANGO_SETTINGS_MODULE', 'superlists.settings')
+        env['SUPERLISTS_WARM_UP'] = '0' if options['no_warm_up'] else '1'
+        child = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.startup'], cwd=settings.BASE_DIR,
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if child.returncode:
+            raise CommandError(
+                'Startup failed:\n' + child.stderr.decode('utf-8', 'replace'))
+        report = json.loads(child.stdout.decode('utf-8'))
+        if options['json']:
+            with open(options['json'], 'w') as output:
+                json.dump(report, output, indent=2)
+        self.write_report(report, options['top'])
+
+    def write_report(self, report, top):
+        write = self.stdout.write
+        write(f"python {report['python']}, warm-up "
+              f"{'on' if report['warm_up'] else 'off'}")
+        write('\nphase                          ms')
+        for name, seconds in report['phases'].items():
+            write(f'{name:<26}{seconds * 1000:>8.1f}')
+        for name, seconds in report['warm_up_steps'].items():
+            write(f'  warm-up {name:<16}{seconds * 1000:>8.1f}')
+        first, second = report['home_page_requests']
+        write(f'{"first request":<26}{first * 1000:>8.1f}')
+        write(f'{"second request":<26}{second * 1000:>8.1f}')
+
+        modules = sorted(report['modules'], key=lambda m: m[2], reverse=True)
+        write(f'\n{len(modules)} modules imported; slowest {top}:')
+        write(f'{"cumulative ms":>14}{"self ms":>10}  module')
+        for name, own, cumulative in modules[:top]:
+            write(f'{cumulative * 1000:>14.1f}{own * 1000:>10.1f}  {name}')
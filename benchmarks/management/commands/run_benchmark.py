@@ -0,0 +1,98 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from benchmarks.workload import (DEFAULT_MIX, ClientDriver, HTTPDriver,
+                                 Workload, run, write_report)
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in DEFAULT_MIX or not weight.isdigit():
+            raise CommandError(
+                f"Bad mix entry '{part}'; expected name=weight with name "
+                f"one of {', '.join(sorted(DEFAULT_MIX))}")
+        mix[name] = int(weight)
+    return mix
+
+
+class Command(BaseCommand):
+    help = ('Replay a seeded mix of list requests and report throughput, '
+            'latency percentiles and queries per request.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            help='Base URL of a running server, e.g. http://127.0.0.1:8000. '
+                 'It must use the same database as this command, which is '
+                 'seeded directly. Defaults to the in-process test client '
+                 'against a throwaway test database.')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Parallel clients; only used with --target.')
+        parser.add_argument('--lists', type=int, default=20)
+        parser.add_argument('--items-per-list', type=int, default=20)
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--sharees-per-list', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--mix', type=parse_mix, default=DEFAULT_MIX,
+            help='Comma separated operation weights, e.g. '
+                 'view_list_get=80,view_list_post=20')
+        parser.add_argument('--output', help='Write a JSON report here.')
+
+    def handle(self, *args, **options):
+        workload = Workload(
+            lists=options['lists'], items_per_list=options['items_per_list'],
+            users=options['users'],
+            sharees_per_list=options['sharees_per_list'],
+            seed=options['seed'])
+
+        if options['target']:
+            driver = HTTPDriver(options['target'])
+            results = self.run(driver, workload, options)
+        else:
+            if options['concurrency'] != 1:
+                raise CommandError('--concurrency needs --target')
+            results = self.run_in_test_database(workload, options)
+
+        config = {key: options[key] for key in (
+            'target', 'requests', 'concurrency', 'lists', 'items_per_list',
+            'users', 'sharees_per_list', 'seed', 'mix')}
+        config['driver'] = 'http' if options['target'] else 'client'
+        if options['output']:
+            write_report(options['output'], config, results)
+        self.report(results)
+
+    def run(self, driver, workload, options):
+        workload.seed_data()
+        return run(driver, workload, requests=options['requests'],
+                   mix=options['mix'], concurrency=options['concurrency'])
+
+    def run_in_test_database(self, workload, options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            return self.run(ClientDriver(), workload, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def report(self, results):
+        self.stdout.write(
+            f"{results['requests']} requests in {results['duration_s']:.2f}s "
+            f"({results['throughput_rps']:.1f} req/s), "
+            f"{results['errors']} errors")
+        self.stdout.write(
+            f"{'operation':<16}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'p99 ms':>9}{'queries':>9}")
+        for name, stats in results['operations'].items():
+            queries = stats['queries_per_request']
+            self.stdout.write(
+                f"{name:<16}{stats['requests']:>7}{stats['p50_ms']:>9.2f}"
+                f"{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+                f"{'-' if queries is None else format(queries, '.1f'):>9}")
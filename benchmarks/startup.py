@@ -0,0 +1,94 @@
+"""Measure how long a fresh process takes to become ready to serve.
+
+Run as ``python -m benchmarks.startup`` in a new interpreter (the
+profile_startup command does this): it times every import by wrapping
+``__import__``, then the phases of a gunicorn worker boot and the first
+requests, and prints the results as JSON. ``-X importtime`` would do the
+import part, but only exists from Python 3.7 on.
+"""
+import builtins
+import json
+import os
+import sys
+import time
+from wsgiref.util import setup_testing_defaults
+
+_original_import = builtins.__import__
+# Per module: [self seconds, cumulative seconds].
+_modules = {}
+_stack = []
+
+
+def _module_name(name, globals, level):
+    if not level:
+        return name
+    package = (globals or {}).get('__package__') or ''
+    base = package.rsplit('.', level - 1)[0] if level > 1 else package
+    return f'{base}.{name}' if name else base
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    module_name = _module_name(name, globals, level)
+    if module_name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    _stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += elapsed
+        timing = _modules.setdefault(module_name, [0.0, 0.0])
+        timing[0] += elapsed - children
+        timing[1] += elapsed
+
+
+def _timed(phases, name, function):
+    start = time.perf_counter()
+    result = function()
+    phases[name] = time.perf_counter() - start
+    return result
+
+
+def main():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'superlists.settings')
+    started = time.perf_counter()
+    phases = {}
+    builtins.__import__ = _timed_import
+    try:
+        _timed(phases, 'import django', lambda: __import__('django'))
+        _timed(phases, 'load wsgi application',
+               lambda: __import__('superlists.wsgi'))
+    finally:
+        builtins.__import__ = _original_import
+    phases['total'] = time.perf_counter() - started
+
+    from django.conf import settings
+    from superlists import warmup
+    from superlists.wsgi import application
+    host = (settings.ALLOWED_HOSTS or ['localhost'])[0]
+    requests = []
+    for _ in range(2):
+        environ = {'HTTP_HOST': host, 'PATH_INFO': '/'}
+        setup_testing_defaults(environ)
+        start = time.perf_counter()
+        response = application(environ, lambda status, headers: None)
+        b''.join(response)
+        response.close()
+        requests.append(time.perf_counter() - start)
+
+    json.dump({
+        'python': sys.version.split()[0],
+        'warm_up': warmup.enabled(),
+        'phases': phases,
+        'warm_up_steps': dict(warmup.timings),
+        'home_page_requests': requests,
+        'modules': [[name, own, cumulative]
+                    for name, (own, cumulative) in _modules.items()],
+    }, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import random
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from benchmarks.dataset import Distribution, Generator
+from lists.models import Item, List
+
+User = get_user_model()
+
+
+class DistributionTest(TestCase):
+
+    def test_fixed_and_uniform(self):
+        rng = random.Random(0)
+        self.assertEqual(Distribution('fixed:3').sample(rng), 3)
+        self.assertIn(Distribution('uniform:2:4').sample(rng), (2, 3, 4))
+
+    def test_pareto_is_capped(self):
+        rng = random.Random(0)
+        samples = [Distribution('pareto:0.5:10').sample(rng)
+                   for _ in range(200)]
+        self.assertLessEqual(max(samples), 10)
+
+    def test_rejects_bad_specs(self):
+        for spec in ('fixed', 'uniform:1', 'normal:1:2', 'fixed:x'):
+            with self.assertRaises(ValueError):
+                Distribution(spec)
+
+
+class GeneratorTest(TestCase):
+
+    def generate(self, **kwargs):
+        options = dict(
+            users=4, lists_per_owner=Distribution('fixed:2'),
+            items_per_list=Distribution('fixed:3'),
+            sharees_per_list=Distribution('fixed:1'), batch_size=5)
+        options.update(kwargs)
+        return Generator(**options).run()
+
+    def test_creates_rows_matching_distributions(self):
+        totals = self.generate()
+        self.assertEqual(totals, {
+            'users': 4, 'lists': 8, 'items': 24, 'shares': 8})
+        self.assertEqual(User.objects.count(), 4)
+        self.assertEqual(List.objects.count(), 8)
+        self.assertEqual(Item.objects.count(), 24)
+
+    def test_lists_are_consistent_with_their_items(self):
+        self.generate()
+        for list_ in List.objects.all():
+            self.assertEqual(list_.name, list_.item_set.first().text)
+            self.assertNotIn(list_.owner, list_.shared_with.all())
+
+    def test_appends_after_existing_lists(self):
+        List.create_new(first_item_text='existing')
+        self.generate(users=1, prefix='more')
+        self.assertEqual(List.objects.count(), 3)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('generate_dataset', '--users=3',
+                     '--lists-per-owner=fixed:1', '--items-per-list=fixed:2',
+                     stdout=out)
+        self.assertIn('created 3 users, 3 lists, 6 items', out.getvalue())
@@ -0,0 +1,27 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from benchmarks.startup import _module_name
+
+
+class ModuleNameTest(SimpleTestCase):
+
+    def test_resolves_relative_imports(self):
+        globals_ = {'__package__': 'django.db.models'}
+        self.assertEqual(_module_name('json', None, 0), 'json')
+        self.assertEqual(
+            _module_name('fields', globals_, 1), 'django.db.models.fields')
+        self.assertEqual(_module_name('utils', globals_, 2), 'django.db.utils')
+        self.assertEqual(_module_name('', globals_, 1), 'django.db.models')
+
+
+class ProfileStartupCommandTest(SimpleTestCase):
+
+    def test_reports_phases_and_slowest_imports(self):
+        out = StringIO()
+        call_command('profile_startup', '--top=3', stdout=out)
+        report = out.getvalue()
+        self.assertIn('load wsgi application', report)
+        self.assertIn('warm-up templates', report)
+        self.assertIn('first request', report)
+        self.assertIn('superlists.wsgi', report)
@@ -0,0 +1,46 @@
+from django.test import TestCase
+from benchmarks.workload import ClientDriver, Workload, percentile, run
+from lists.models import List
+
+
+class PercentileTest(TestCase):
+
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([3, 1, 2], 1), 3)
+
+    def test_empty(self):
+        self.assertIsNone(percentile([], 0.5))
+
+
+class WorkloadTest(TestCase):
+
+    def test_plan_is_reproducible_for_a_seed(self):
+        mix = {'home_page': 1, 'view_list_get': 3}
+        self.assertEqual(Workload(seed=1).plan(50, mix),
+                         Workload(seed=1).plan(50, mix))
+        self.assertNotEqual(Workload(seed=1).plan(50, mix),
+                            Workload(seed=2).plan(50, mix))
+
+    def test_seeds_configured_data_sizes(self):
+        workload = Workload(lists=3, items_per_list=4, users=2)
+        workload.seed_data()
+        self.assertEqual(List.objects.count(), 3)
+        self.assertEqual(
+            [list_.item_set.count() for list_ in List.objects.all()],
+            [4, 4, 4])
+
+    def test_run_reports_every_operation_without_errors(self):
+        workload = Workload(lists=2, items_per_list=3, users=2)
+        workload.seed_data()
+        results = run(ClientDriver(), workload, requests=60)
+        self.assertEqual(results['requests'], 60)
+        self.assertEqual(results['errors'], 0)
+        self.assertEqual(
+            set(results['operations']),
+            {'home_page', 'new_list', 'view_list_get', 'view_list_post',
+             'share_list', 'my_lists'})
+        self.assertEqual(
+            results['operations']['my_lists']['queries_per_request'], 3)
@@ -0,0 +1,246 @@
+"""Reproducible request mixes for the list workflows.
+
+A run seeds lists, items and users, then replays a seeded random sequence
+of operations through a driver: either the Django test client in this
+process or HTTP against a running server.
+"""
+import http.cookiejar
+import itertools
+import json
+import math
+import platform
+import random
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+import django
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from lists.models import List
+
+DEFAULT_MIX = {
+    'home_page': 10,
+    'new_list': 10,
+    'view_list_get': 45,
+    'view_list_post': 20,
+    'share_list': 5,
+    'my_lists': 10,
+}
+
+
+class ClientDriver(object):
+    """Sends requests through the test client and counts their queries."""
+
+    name = 'client'
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            if method == 'GET':
+                response = self.client.get(path)
+            else:
+                response = self.client.post(path, data)
+        return response.status_code, response.get('Location'), len(queries)
+
+
+class HTTPDriver(object):
+    """Sends requests to a running server, e.g. a local gunicorn."""
+
+    name = 'http'
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.local = threading.local()
+
+    def _opener(self):
+        if not hasattr(self.local, 'opener'):
+            jar = http.cookiejar.CookieJar()
+            self.local.jar = jar
+            self.local.opener = urllib.request.build_opener(
+                urllib.request.HTTPCookieProcessor(jar), _NoRedirect)
+            self.local.opener.open(self.base_url + '/').read()
+        return self.local.opener
+
+    def _csrf_token(self):
+        for cookie in self.local.jar:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def request(self, method, path, data=None):
+        opener = self._opener()
+        body = None
+        if method == 'POST':
+            body = urllib.parse.urlencode(data or {}).encode('utf-8')
+        request = urllib.request.Request(
+            self.base_url + path, data=body, method=method)
+        if method == 'POST':
+            request.add_header('X-CSRFToken', self._csrf_token())
+        try:
+            response = opener.open(request)
+        except urllib.error.HTTPError as error:
+            response = error
+        with response:
+            response.read()
+            return response.status, response.headers.get('Location'), None
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Workload(object):
+
+    def __init__(self, lists=20, items_per_list=20, users=10,
+                 sharees_per_list=1, seed=0):
+        self.list_count = lists
+        self.items_per_list = items_per_list
+        self.user_count = users
+        self.sharees_per_list = sharees_per_list
+        self.seed = seed
+        self.list_ids = []
+        self.emails = []
+        self.counter = itertools.count()
+
+    def seed_data(self):
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
+        rng = random.Random(self.seed)
+        self.emails = [f'bench-{self.seed}-{n}@example.com'
+                       for n in range(self.user_count)]
+        for email in self.emails:
+            User.objects.get_or_create(email=email)
+        for n in range(self.list_count):
+            list_ = List.create_new(first_item_text=f'bench list {n}')
+            list_.add_items([f'bench item {n}.{i}'
+                             for i in range(1, self.items_per_list)])
+            list_.shared_with.add(*rng.sample(
+                self.emails, min(self.sharees_per_list, len(self.emails))))
+            self.list_ids.append(list_.id)
+
+    def plan(self, requests, mix):
+        rng = random.Random(self.seed)
+        names = sorted(mix)
+        weights = [mix[name] for name in names]
+        return [rng.choices(names, weights)[0] for _ in range(requests)]
+
+    def operation(self, name, rng):
+        text = f'bench {name} {next(self.counter)}'
+        if name == 'home_page':
+            return 'GET', '/', None
+        if name == 'new_list':
+            return 'POST', '/lists/new', {'text': text}
+        if name == 'my_lists':
+            return 'GET', f'/lists/users/{rng.choice(self.emails)}/', None
+        list_id = rng.choice(self.list_ids)
+        if name == 'view_list_get':
+            return 'GET', f'/lists/{list_id}/', None
+        if name == 'view_list_post':
+            return 'POST', f'/lists/{list_id}/', {'text': text}
+        if name == 'share_list':
+            return ('POST', f'/lists/{list_id}/share',
+                    {'sharee': rng.choice(self.emails)})
+        raise ValueError(f'Unknown operation {name}')
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run(driver, workload, requests=500, mix=None, concurrency=1):
+    mix = mix or DEFAULT_MIX
+    plan = workload.plan(requests, mix)
+    samples = defaultdict(list)
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(f'{workload.seed}-{index}')
+        for name in plan[index::concurrency]:
+            method, path, data = workload.operation(name, rng)
+            start = time.perf_counter()
+            status, _, queries = driver.request(method, path, data)
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples[name].append((elapsed, status, queries))
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        worker(0)
+    else:
+        threads = [threading.Thread(target=worker, args=(index,))
+                   for index in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    duration = time.perf_counter() - started
+    return summarize(samples, duration)
+
+
+def summarize(samples, duration):
+    operations = {}
+    all_latencies, errors = [], 0
+    for name, rows in sorted(samples.items()):
+        latencies = [row[0] for row in rows]
+        queries = [row[2] for row in rows if row[2] is not None]
+        failed = sum(1 for row in rows if row[1] >= 400)
+        errors += failed
+        all_latencies.extend(latencies)
+        operations[name] = {
+            'requests': len(rows),
+            'errors': failed,
+            'mean_ms': 1000 * sum(latencies) / len(latencies),
+            'p50_ms': 1000 * percentile(latencies, 0.50),
+            'p95_ms': 1000 * percentile(latencies, 0.95),
+            'p99_ms': 1000 * percentile(latencies, 0.99),
+            'queries_per_request': (
+                sum(queries) / len(queries) if queries else None),
+        }
+    return {
+        'requests': len(all_latencies),
+        'errors': errors,
+        'duration_s': duration,
+        'throughput_rps': len(all_latencies) / duration if duration else None,
+        'p50_ms': 1000 * (percentile(all_latencies, 0.50) or 0),
+        'p95_ms': 1000 * (percentile(all_latencies, 0.95) or 0),
+        'p99_ms': 1000 * (percentile(all_latencies, 0.99) or 0),
+        'operations': operations,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+
+
+def write_report(path, config, results):
+    with open(path, 'w') as report:
+        json.dump({'environment': environment(), 'config': config,
+                   'results': results}, report, indent=2, sort_keys=True)
@@ -44,7 +44,10 @@ def _create_or_update_dotenv():
 
 
 def _update_static_files():
-    run("./virtualenv/bin/python3 manage.py collectstatic --no-input")
+    # Load .env so collectstatic uses the production (hashed and
+    # precompressed) storage the site will look files up in.
+    run("set -a && . ./.env && set +a && "
+        "./virtualenv/bin/python3 manage.py collectstatic --no-input")
 
 
 def _update_database():
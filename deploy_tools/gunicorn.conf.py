@@ -0,0 +1,49 @@
+"""gunicorn settings for the site; see provisioning_notes.md.
+
+Every value can be overridden from the environment (the systemd unit reads
+the site's .env), e.g. GUNICORN_WORKER_CLASS=sync GUNICORN_WORKERS=5.
+Defaults come from `manage.py run_benchmark` runs recorded in the commit
+that added this file.
+"""
+import multiprocessing
+import os
+
+
+def _env(name, default, cast=int):
+    value = os.environ.get(f'GUNICORN_{name}')
+    return default if value in (None, '') else cast(value)
+
+
+cpus = multiprocessing.cpu_count()
+
+# gthread: each worker process serves several requests at once on threads,
+# so one slow request (a huge list, a stalled SMTP server) no longer holds
+# up everything behind it. sync: one request per process.
+# One process per CPU: more only added contention in the benchmarks (the
+# GIL and SQLite's single writer limit each machine, not each process).
+worker_class = _env('WORKER_CLASS', 'gthread', str)
+workers = _env('WORKERS', cpus)
+threads = _env('THREADS', 8 if worker_class == 'gthread' else 1)
+
+# Recycle workers now and then to bound memory growth; the jitter keeps
+# them from all restarting at once.
+max_requests = _env('MAX_REQUESTS', 1000)
+max_requests_jitter = _env('MAX_REQUESTS_JITTER', 100)
+
+# Keep idle connections from nginx's upstream pool open (gthread only).
+keepalive = _env('KEEPALIVE', 5)
+timeout = _env('TIMEOUT', 30)
+graceful_timeout = _env('GRACEFUL_TIMEOUT', 30)
+
+# Import the app and run superlists.warmup once in the master; workers,
+# including ones started by max_requests, fork already warm.
+preload_app = _env('PRELOAD', 1) == 1
+
+
+def post_fork(server, worker):
+    # Never share a database connection opened in the master.
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+    for connection in connections.all():
+        connection.close()
@@ -4,6 +4,7 @@ import poplib
 import time
 
 from django.core import mail
+from django.core.management import call_command
 from selenium.webdriver.common.keys import Keys
 
 
@@ -15,6 +16,7 @@ SUBJECT = 'Your login link for Superlists'
 class LoginTest(FunctionalTest):
     def wait_for_email(self, test_email, subject):
         if not self.staging_server:
+            call_command('send_outbox', '--once')
             email = mail.outbox[0]
             self.assertIn(test_email, email.to)
             self.assertEqual(email.subject, subject)
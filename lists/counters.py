@@ -0,0 +1,47 @@
+"""Recompute List's denormalized item_count and title from its items, for
+use after data is changed behind the models' back."""
+from django.db import transaction
+from django.db.models import (Count, F, Func, IntegerField, OuterRef,
+                              Subquery, TextField, UUIDField, Value)
+from django.db.models.functions import Coalesce
+
+
+class RandomUUID(Func):
+    # A fresh version per row; SQLite stores UUIDField as 32 hex digits.
+    template = 'lower(hex(randomblob(16)))'
+    output_field = UUIDField()
+
+
+def repair_counters(List, Item, batch_size=1000, progress=None, lists=None):
+    """Fix lists a batch of ids at a time, one UPDATE per batch. Takes the
+    model classes so migrations can pass their historical models; lists
+    limits the repair to a queryset of them.
+
+    Only lists whose stored values were wrong are updated and counted, and
+    they get a new version so ETags and cached fragments of the wrong
+    values are dropped."""
+    lists = List.objects.all() if lists is None else lists
+    counts = Item.objects.filter(list=OuterRef('pk')).order_by().values(
+        'list').annotate(n=Count('id')).values('n')
+    first_texts = Item.objects.filter(
+        list=OuterRef('pk')).order_by('id').values('text')[:1]
+    item_count = Coalesce(
+        Subquery(counts, output_field=IntegerField()), Value(0))
+    title = Coalesce(
+        Subquery(first_texts, output_field=TextField()), Value(''))
+
+    last_id, repaired = 0, 0
+    while True:
+        ids = list(lists.filter(id__gt=last_id).order_by(
+            'id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return repaired
+        with transaction.atomic():
+            repaired += lists.filter(
+                id__gte=ids[0], id__lte=ids[-1]).annotate(
+                actual_count=item_count, actual_title=title).exclude(
+                item_count=F('actual_count'), title=F('actual_title')).update(
+                item_count=item_count, title=title, version=RandomUUID())
+        last_id = ids[-1]
+        if progress:
+            progress(repaired, last_id)
@@ -1,5 +1,5 @@
-from django.core.exceptions import ValidationError
 from django import forms
+from django.db import IntegrityError, transaction
 from lists.models import Item, List
 
 EMPTY_ITEM_ERROR = "You can't have an empty list item"
@@ -31,11 +31,18 @@ class ExistingListItemForm(ItemForm):
         self.instance.list = for_list
 
     def validate_unique(self):
+        # Duplicates are caught by the unique constraint in save(), which
+        # saves a query per item and holds up under concurrent posts.
+        pass
+
+    def save(self):
         try:
-            self.instance.validate_unique()
-        except ValidationError as e:
-            e.error_dict = {'text': [DUPLICATE_ITEM_ERROR]}
-            self._update_errors(e)
+            with transaction.atomic():
+                return super().save()
+        except IntegrityError:
+            self.add_error('text', DUPLICATE_ITEM_ERROR)
+            return None
+
 
 class NewListForm(ItemForm):
 
@@ -0,0 +1,44 @@
+import hashlib
+from collections import Counter
+from django.conf import settings
+from django.core.cache import caches
+
+# Hits and misses per fragment name, counted in this process.
+stats = Counter()
+
+STAT_METRICS = (
+    ('hit', 'list_fragment_cache_hits_total'),
+    ('miss', 'list_fragment_cache_misses_total'),
+)
+
+
+def fragment_key(name, list_, vary_on=()):
+    vary = hashlib.md5(
+        ':'.join(str(value) for value in vary_on).encode('utf-8')).hexdigest()
+    return f'list-fragment:{name}:{list_.pk}:{list_.version.hex}:{vary}'
+
+
+def get_or_render(name, list_, render, vary_on=()):
+    """Return the cached rendering of a list fragment, rendering it on a
+    miss. The key includes the list's version, which changes on every
+    write, so entries never need to expire."""
+    cache = caches[settings.LIST_FRAGMENT_CACHE]
+    key = fragment_key(name, list_, vary_on)
+    value = cache.get(key)
+    if value is None:
+        stats[name, 'miss'] += 1
+        value = render()
+        cache.set(key, value, None)
+    else:
+        stats[name, 'hit'] += 1
+    return value
+
+
+def render_stats():
+    lines = []
+    for result, metric in STAT_METRICS:
+        lines.append(f'# TYPE {metric} counter')
+        for (name, counted), value in sorted(stats.items()):
+            if counted == result:
+                lines.append(f'{metric}{{fragment="{name}"}} {value}')
+    return '\n'.join(lines) + '\n'
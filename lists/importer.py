@@ -0,0 +1,159 @@
+"""Bulk import of lists from the CSV or JSON Lines files that lists.export
+writes. Rows are read as a stream and written in batches: new lists get
+explicit ids in one bulk insert, their items another, so the cost per row
+is a share of a few queries per batch rather than a form save per item."""
+import csv
+import json
+import time
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Max
+from lists.counters import RandomUUID, repair_counters
+from lists.models import IN_QUERY_CHUNK_SIZE, Item, List
+
+User = get_user_model()
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+class ImportFileError(ValueError):
+    pass
+
+
+def read_csv(lines):
+    reader = csv.DictReader(lines)
+    missing = {'list_id', 'text'} - set(reader.fieldnames or ())
+    if missing:
+        raise ImportFileError(f"CSV header lacks {', '.join(sorted(missing))}")
+    for row in reader:
+        yield row['list_id'], row.get('owner') or None, row['text'] or ''
+
+
+def read_jsonl(lines):
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            yield str(row['list_id']), row.get('owner'), row.get('text') or ''
+        except (ValueError, KeyError, TypeError):
+            raise ImportFileError(
+                f'Line {number} is not a JSON object with a list_id')
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl}
+
+
+class Importer(object):
+    """Create a list for every distinct list_id in the rows and add its
+    items, skipping empty and duplicate texts. With owner set, every list
+    belongs to that user; otherwise to the row's owner, created if needed.
+
+    Items are counted and titles set once at the end, also when the rows
+    turn out to be bad partway: the batches before then stay imported, and
+    `totals` says how much of the file that was."""
+
+    def __init__(self, owner=None, batch_size=DEFAULT_BATCH_SIZE,
+                 progress=None):
+        self.owner = owner
+        self.batch_size = batch_size
+        self.progress = progress
+        self.list_ids = {}
+        self.first_batch_of = {}
+        self.totals = {'rows': 0, 'lists': 0, 'items': 0, 'duplicates': 0}
+
+    def run(self, rows):
+        started = time.perf_counter()
+        try:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._flush(batch)
+                    batch = []
+                    if self.progress:
+                        self.progress(
+                            self.totals, time.perf_counter() - started)
+            if batch:
+                self._flush(batch)
+        finally:
+            if self.list_ids:
+                ids = self.list_ids.values()
+                repair_counters(List, Item, lists=List.objects.filter(
+                    id__gte=min(ids), id__lte=max(ids)))
+            self.totals['seconds'] = time.perf_counter() - started
+        return self.totals
+
+    def _flush(self, batch):
+        with transaction.atomic():
+            self._create_lists(batch)
+            self._create_items(batch)
+        self.totals['rows'] += len(batch)
+
+    def _create_lists(self, batch):
+        owners = {}
+        for key, owner, _ in batch:
+            if key not in self.list_ids and key not in owners:
+                owners[key] = self.owner.email if self.owner else owner
+        if not owners:
+            return
+        self._create_users(set(filter(None, owners.values())))
+        # Explicit ids, because SQLite does not return the ids of bulk
+        # inserts; the transaction holds the write lock, so none collide.
+        next_id = (List.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+        new_lists = []
+        for list_id, (key, owner) in enumerate(owners.items(), start=next_id):
+            self.list_ids[key] = list_id
+            self.first_batch_of[list_id] = self.totals['rows']
+            new_lists.append(List(id=list_id, owner_id=owner))
+        List.objects.bulk_create(new_lists)
+        self.totals['lists'] += len(new_lists)
+
+    def _create_users(self, emails):
+        emails = list(emails)
+        existing = set()
+        for start in range(0, len(emails), IN_QUERY_CHUNK_SIZE):
+            existing.update(User.objects.filter(
+                email__in=emails[start:start + IN_QUERY_CHUNK_SIZE]
+            ).values_list('email', flat=True))
+        User.objects.bulk_create(
+            User(email=email) for email in emails if email not in existing)
+
+    def _create_items(self, batch):
+        texts = {}
+        for key, _, text in batch:
+            text = text.strip()
+            if text:
+                texts.setdefault(self.list_ids[key], {}).setdefault(text)
+        new_items, grown = [], []
+        for list_id, list_texts in texts.items():
+            # Lists first seen in this batch cannot have items yet.
+            if self.first_batch_of[list_id] < self.totals['rows']:
+                self._drop_existing(list_id, list_texts)
+                if list_texts:
+                    grown.append(list_id)
+            new_items.extend(
+                Item(list_id=list_id, text=text) for text in list_texts)
+        Item.objects.bulk_create(new_items)
+        # Earlier batches may have been read and cached under the version
+        # their lists had then.
+        for start in range(0, len(grown), IN_QUERY_CHUNK_SIZE):
+            List.objects.filter(
+                id__in=grown[start:start + IN_QUERY_CHUNK_SIZE]
+            ).update(version=RandomUUID())
+        self.totals['items'] += len(new_items)
+        self.totals['duplicates'] += sum(
+            1 for _, _, text in batch if text.strip()) - len(new_items)
+
+    def _drop_existing(self, list_id, list_texts):
+        wanted = list(list_texts)
+        for start in range(0, len(wanted), IN_QUERY_CHUNK_SIZE):
+            for text in Item.objects.filter(
+                    list_id=list_id,
+                    text__in=wanted[start:start + IN_QUERY_CHUNK_SIZE]
+            ).order_by().values_list('text', flat=True):
+                del list_texts[text]
+
+
+def import_lists(lines, format, **options):
+    return Importer(**options).run(READERS[format](lines))
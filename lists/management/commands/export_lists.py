@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from lists import export
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Write every list a user owns or was shared, one row per item, '
+            'as CSV or JSON Lines.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('email')
+        parser.add_argument(
+            '--format', choices=sorted(export.FORMATS), default='csv')
+        parser.add_argument(
+            '--output', help='Write to this file instead of stdout.')
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.EXPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['email'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user {options['email']}")
+        render_lines, _ = export.FORMATS[options['format']]
+        chunks = export.chunked(render_lines(
+            export.export_rows(user, batch_size=options['batch_size'])))
+        if options['output']:
+            with open(options['output'], 'w', newline='',
+                      encoding='utf-8') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
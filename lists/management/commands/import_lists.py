@@ -0,0 +1,55 @@
+import io
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from lists.importer import (DEFAULT_BATCH_SIZE, READERS, ImportFileError,
+                            Importer)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Create lists from a CSV or JSON Lines file in the format '
+            'export_lists writes, in batched inserts.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--format', choices=sorted(READERS),
+            help='Defaults to the file extension.')
+        parser.add_argument(
+            '--owner',
+            help='Give every list to this user instead of the owner column.')
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or path.rpartition('.')[2]
+        if format not in READERS:
+            raise CommandError(
+                f"Cannot tell the format of {path}; pass --format")
+        owner = None
+        if options['owner']:
+            owner, _ = User.objects.get_or_create(email=options['owner'])
+
+        importer = Importer(owner=owner, batch_size=options['batch_size'],
+                            progress=self.progress)
+        with io.open(path, newline='', encoding='utf-8') as lines:
+            try:
+                importer.run(READERS[format](lines))
+            except (ImportFileError, UnicodeDecodeError) as error:
+                raise CommandError(
+                    f'{error}; {self.summary(importer.totals)} before it')
+        self.stdout.write(self.summary(importer.totals))
+
+    def summary(self, totals):
+        return (
+            'imported {lists} lists, {items} items from {rows} rows '
+            '({duplicates} duplicates skipped) in {seconds:.1f}s'.format(
+                **totals))
+
+    def progress(self, totals, elapsed):
+        self.stdout.write(
+            f"{totals['rows']} rows, {totals['lists']} lists, "
+            f"{totals['items']} items in {elapsed:.1f}s "
+            f"({totals['items'] / elapsed:.0f} items/s)")
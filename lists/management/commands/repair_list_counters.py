@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from lists.counters import repair_counters
+from lists.models import Item, List
+
+
+class Command(BaseCommand):
+    help = "Recompute every list's item_count and title from its items."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        repaired = repair_counters(
+            List, Item, options['batch_size'], progress=self.progress)
+        self.stdout.write(f'repaired {repaired} lists')
+
+    def progress(self, repaired, last_id):
+        if self.verbosity > 1:
+            self.stdout.write(f'{repaired} lists, up to id {last_id}')
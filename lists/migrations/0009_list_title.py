@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def populate_titles(apps, schema_editor):
+    List = apps.get_model('lists', 'List')
+    Item = apps.get_model('lists', 'Item')
+    for list_ in List.objects.all().iterator():
+        first_item = Item.objects.filter(list=list_).order_by('id').first()
+        if first_item:
+            List.objects.filter(pk=list_.pk).update(title=first_item.text)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0008_auto_20190719_1953'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='list',
+            name='title',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(populate_titles, migrations.RunPython.noop),
+    ]
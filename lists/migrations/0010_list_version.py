@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import uuid
+
+
+def assign_versions(apps, schema_editor):
+    List = apps.get_model('lists', 'List')
+    for pk in List.objects.values_list('pk', flat=True).iterator():
+        List.objects.filter(pk=pk).update(version=uuid.uuid4())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0009_list_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='list',
+            name='version',
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+        migrations.RunPython(assign_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+# An external-content FTS5 index over lists_item.text, kept in step by
+# triggers so bulk inserts and raw SQL are indexed too.
+CREATE_INDEX = [
+    """CREATE VIRTUAL TABLE lists_item_fts USING fts5(
+        text, content='lists_item', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 1', prefix='2 3')""",
+    """CREATE TRIGGER lists_item_fts_insert AFTER INSERT ON lists_item BEGIN
+        INSERT INTO lists_item_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+    """CREATE TRIGGER lists_item_fts_delete AFTER DELETE ON lists_item BEGIN
+        INSERT INTO lists_item_fts(lists_item_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END""",
+    """CREATE TRIGGER lists_item_fts_update AFTER UPDATE OF text ON lists_item
+    BEGIN
+        INSERT INTO lists_item_fts(lists_item_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO lists_item_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+    "INSERT INTO lists_item_fts(lists_item_fts) VALUES ('rebuild')",
+]
+
+DROP_INDEX = [
+    'DROP TRIGGER lists_item_fts_update',
+    'DROP TRIGGER lists_item_fts_delete',
+    'DROP TRIGGER lists_item_fts_insert',
+    'DROP TABLE lists_item_fts',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0010_list_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INDEX, DROP_INDEX),
+    ]
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.21 on 2026-10-18 07:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.utils.timezone
+
+from lists.counters import repair_counters
+
+
+def count_items(apps, schema_editor):
+    repair_counters(apps.get_model('lists', 'List'),
+                    apps.get_model('lists', 'Item'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0011_item_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='list',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='list',
+            name='updated_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(count_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.21 on 2026-10-18 07:03
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lists', '0012_list_item_count_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListChange',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('item_id', models.IntegerField(blank=True, null=True)),
+                ('value', models.TextField(blank=True, default='')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('list', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='lists.List')),
+            ],
+            options={
+                'ordering': ('id',),
+            },
+        ),
+    ]
@@ -1,6 +1,20 @@
-from django.db import models
+import uuid
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
 from django.core.urlresolvers import reverse
 from django.conf import settings
+from django.utils import timezone
+
+ITEM_CREATED = 'created'
+ITEM_DUPLICATE = 'duplicate'
+ITEM_EMPTY = 'empty'
+
+# Stay well below SQLite's limit on the number of variables in a query.
+IN_QUERY_CHUNK_SIZE = 500
+
+# SQLite integers are signed 64-bit; binding anything larger raises
+# OverflowError, and no id can be out of this range anyway.
+MAX_ID = 2 ** 63 - 1
 
 
 class List(models.Model):
@@ -8,19 +22,101 @@ class List(models.Model):
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, blank=True, null=True)
     shared_with = models.ManyToManyField(
         settings.AUTH_USER_MODEL, blank=True, related_name='shared')
+    title = models.TextField(default='', blank=True)
+    version = models.UUIDField(default=uuid.uuid4, editable=False)
+    item_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now, db_index=True)
 
     def get_absolute_url(self):
         return reverse('view_list', args=(self.id,))
 
     @staticmethod
     def create_new(first_item_text, owner=None):
-        list_ = List.objects.create(owner=owner)
-        Item.objects.create(text=first_item_text, list=list_)
+        with transaction.atomic():
+            list_ = List.objects.create(owner=owner)
+            if owner is not None:
+                ListChange.objects.create(
+                    list=list_, kind=ListChange.OWNER_SET, value=owner.pk)
+            Item.objects.create(text=first_item_text, list=list_)
         return list_
 
+    def add_items(self, texts):
+        wanted = list(dict.fromkeys(text for text in texts if text))
+        existing = set()
+        for start in range(0, len(wanted), IN_QUERY_CHUNK_SIZE):
+            existing.update(Item.objects.filter(
+                list=self, text__in=wanted[start:start + IN_QUERY_CHUNK_SIZE]
+            ).order_by().values_list('text', flat=True))
+
+        results, seen, new_items = [], set(), []
+        for text in texts:
+            if not text:
+                results.append((text, ITEM_EMPTY))
+            elif text in existing or text in seen:
+                results.append((text, ITEM_DUPLICATE))
+            else:
+                seen.add(text)
+                new_items.append(Item(list=self, text=text))
+                results.append((text, ITEM_CREATED))
+
+        with transaction.atomic():
+            Item.objects.bulk_create(new_items)
+            if new_items and new_items[0].pk is None:
+                # SQLite does not return the ids of bulk inserted rows.
+                ids = {}
+                for start in range(0, len(new_items), IN_QUERY_CHUNK_SIZE):
+                    ids.update(Item.objects.filter(list=self, text__in=[
+                        item.text for item
+                        in new_items[start:start + IN_QUERY_CHUNK_SIZE]
+                    ]).order_by().values_list('text', 'id'))
+                for item in new_items:
+                    item.pk = ids[item.text]
+            self.items_added(new_items)
+        return results
+
+    def items_added(self, items):
+        if not items:
+            return
+        first_text = items[0].text
+        if not self.title:
+            self.title = first_text
+        self.item_count += len(items)
+        self.version, self.updated_at = uuid.uuid4(), timezone.now()
+        List.objects.filter(pk=self.pk).update(
+            version=self.version,
+            updated_at=self.updated_at,
+            item_count=F('item_count') + len(items),
+            title=Case(When(title='', then=Value(first_text)),
+                       default=F('title'), output_field=models.TextField()))
+        ListChange.objects.bulk_create(
+            ListChange(list=self, kind=ListChange.ITEM_ADDED,
+                       item_id=item.pk, value=item.text)
+            for item in items)
+
+    def items_changed(self, removed=0):
+        first_item = self.item_set.first()
+        self.title = first_item.text if first_item else ''
+        self.item_count -= removed
+        self.version, self.updated_at = uuid.uuid4(), timezone.now()
+        List.objects.filter(pk=self.pk).update(
+            title=self.title, version=self.version,
+            updated_at=self.updated_at,
+            item_count=F('item_count') - removed)
+
+    def sharees_added(self, emails):
+        self.version, self.updated_at = uuid.uuid4(), timezone.now()
+        List.objects.filter(pk=self.pk).update(
+            version=self.version, updated_at=self.updated_at)
+        ListChange.objects.bulk_create(
+            ListChange(list=self, kind=ListChange.SHAREE_ADDED, value=email)
+            for email in emails)
+
+    def change_cursor(self):
+        return self.changes.values_list('id', flat=True).last() or 0
+
     @property
     def name(self):
-        return self.item_set.first().text
+        return self.title
 
 
 class Item(models.Model):
@@ -30,6 +126,49 @@ class Item(models.Model):
     def __str__(self):
         return self.text
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Items are ordered by id, so a new item can only become the
+            # title of a list that has none yet; edits may touch the
+            # current title.
+            if adding:
+                self.list.items_added([self])
+            else:
+                self.list.items_changed()
+                ListChange.objects.create(
+                    list=self.list, kind=ListChange.ITEM_CHANGED,
+                    item_id=self.pk, value=self.text)
+
+    def delete(self, *args, **kwargs):
+        item_id = self.pk
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self.list.items_changed(removed=1)
+            ListChange.objects.create(
+                list=self.list, kind=ListChange.ITEM_REMOVED, item_id=item_id)
+        return result
+
     class Meta:
         unique_together = ('list', 'text')
         ordering = ('id',)
+
+
+class ListChange(models.Model):
+    """Append-only log of changes to a list. Ids only ever grow, so a
+    client can ask for everything after the last id it has seen."""
+    ITEM_ADDED = 'item_added'
+    ITEM_CHANGED = 'item_changed'
+    ITEM_REMOVED = 'item_removed'
+    SHAREE_ADDED = 'sharee_added'
+    OWNER_SET = 'owner_set'
+
+    list = models.ForeignKey(List, related_name='changes')
+    kind = models.CharField(max_length=20)
+    item_id = models.IntegerField(blank=True, null=True)
+    value = models.TextField(default='', blank=True)
+    created = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ('id',)
@@ -0,0 +1,105 @@
+from django.conf import settings
+from lists.models import MAX_ID
+
+
+def _parse_cursor(value):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    if -MAX_ID <= value <= MAX_ID:
+        return value
+
+
+def page_size_from(value):
+    size = _parse_cursor(value) or settings.LIST_PAGE_SIZE
+    return max(1, min(size, settings.LIST_MAX_PAGE_SIZE))
+
+
+class KeysetPage(object):
+    """One page of a queryset ordered by id, addressed by id cursors
+    instead of offsets so fetching page N costs the same as page 1.
+
+    Nothing is queried until the page is first used, so a template that
+    serves the page from a cached fragment never touches the database.
+
+    Row numbers are carried along with the cursor as `start`, the number
+    of items before it, rather than counted, which would cost more the
+    deeper the page.
+    """
+
+    def __init__(self, queryset, after=None, before=None, page_size=None,
+                 start=None):
+        self.queryset = queryset
+        self.after = _parse_cursor(after)
+        self.before = _parse_cursor(before)
+        self.page_size = page_size_from(page_size)
+        self.start = max(_parse_cursor(start) or 0, 0)
+        self._fetched = False
+
+    def _fetch(self):
+        if self._fetched:
+            return
+        page_size = self.page_size
+
+        if self.before is not None:
+            rows = list(self.queryset.filter(
+                id__lt=self.before).order_by('-id')[:page_size + 1])
+            self._has_previous = len(rows) > page_size
+            self._items = rows[:page_size][::-1]
+            self._has_next = bool(self._items)
+        else:
+            page_queryset = self.queryset
+            if self.after is not None:
+                page_queryset = self.queryset.filter(id__gt=self.after)
+            rows = list(page_queryset.order_by('id')[:page_size + 1])
+            self._has_next = len(rows) > page_size
+            self._items = rows[:page_size]
+            self._has_previous = self.after is not None and bool(self._items)
+
+        self._offset = 0
+        if self._has_previous:
+            self._offset = self.start
+            if self.before is not None:
+                self._offset = max(self.start - len(self._items), 0)
+        # Only now, so a failed query raises again rather than leaving
+        # the page half filled in.
+        self._fetched = True
+
+    @property
+    def items(self):
+        self._fetch()
+        return self._items
+
+    @property
+    def has_next(self):
+        self._fetch()
+        return self._has_next
+
+    @property
+    def has_previous(self):
+        self._fetch()
+        return self._has_previous
+
+    @property
+    def offset(self):
+        self._fetch()
+        return self._offset
+
+    @property
+    def next_start(self):
+        return self.offset + len(self.items)
+
+    @property
+    def next_cursor(self):
+        if self.has_next:
+            return self.items[-1].id
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous:
+            return self.items[0].id
+
+
+def paginate(queryset, after=None, before=None, page_size=None, start=None):
+    return KeysetPage(queryset, after, before, page_size, start)
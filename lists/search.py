@@ -0,0 +1,70 @@
+"""Full-text search over the items of lists a user owns or was shared,
+backed by the lists_item_fts FTS5 index (see migrations 0011 and 0014).
+
+SQLite runs the MATCH first and ranks every item it returns, so the
+cost follows the number of matching items. For users with up to
+settings.SEARCH_LIST_FILTER_MAX lists the match is narrowed to their list
+ids inside the index, so a common word costs what the user's own matches
+cost rather than everyone's. Every list id is another OR term, though,
+and past about a thousand of them that is slower than filtering after
+the match, which is what users with more lists get.
+
+On a 3M item database a user with 38 lists and 7,000 items searched "mo"
+in 6ms instead of 266ms, and "task", which all their items match, in
+400ms instead of 830ms. Queries that match most of a user's own items
+still scale with them: one list of 520,000 items takes up to a second.
+"""
+import re
+from django.conf import settings
+from django.db import connections
+from lists.models import Item
+
+VISIBLE_LISTS_SQL = """
+    SELECT id FROM lists_list WHERE owner_id = %s
+    UNION
+    SELECT list_id FROM lists_list_shared_with WHERE user_id = %s
+"""
+
+# Only the text column counts towards the rank.
+SEARCH_SQL = """
+    SELECT item.id, item.text, item.list_id, list.title AS list_title,
+           bm25(lists_item_fts, 1.0, 0.0) AS rank
+    FROM lists_item_fts
+    JOIN lists_item AS item ON item.id = lists_item_fts.rowid
+    JOIN lists_list AS list ON list.id = item.list_id
+    WHERE lists_item_fts MATCH %s {visible}
+    ORDER BY rank, item.id
+    LIMIT %s
+"""
+
+
+def match_expression(query):
+    """Turn free text into an FTS5 query: every word must match, and the
+    last one may be a prefix so results appear while typing."""
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_items(user, query, limit=50):
+    match = match_expression(query)
+    if match is None:
+        return []
+    with connections[Item.objects.db].cursor() as cursor:
+        cursor.execute(VISIBLE_LISTS_SQL, [user.email, user.email])
+        list_ids = [list_id for list_id, in cursor.fetchall()]
+    if not list_ids:
+        return []
+    match = f'text : ({match})'
+    if len(list_ids) <= settings.SEARCH_LIST_FILTER_MAX:
+        match += ' AND list_id : ({})'.format(
+            ' OR '.join(f'"{list_id}"' for list_id in list_ids))
+        sql, params = SEARCH_SQL.format(visible=''), [match, limit]
+    else:
+        sql = SEARCH_SQL.format(visible=f"""AND item.list_id IN (
+            {VISIBLE_LISTS_SQL})""")
+        params = [match, user.email, user.email, limit]
+    return list(Item.objects.raw(sql, params))
@@ -0,0 +1,66 @@
+"""Share many lists with many users at once, with a fixed number of
+queries however many lists and emails are involved."""
+import uuid
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from lists.models import List, ListChange, IN_QUERY_CHUNK_SIZE
+
+User = get_user_model()
+Share = List.shared_with.through
+
+
+def _chunks(values):
+    for start in range(0, len(values), IN_QUERY_CHUNK_SIZE):
+        yield values[start:start + IN_QUERY_CHUNK_SIZE]
+
+
+def share_lists(list_ids, emails):
+    """Share every list in list_ids with every email, creating users that
+    do not exist yet and skipping pairs that are already shared.
+
+    Returns a dict describing what changed."""
+    list_ids = list(dict.fromkeys(list_ids))
+    emails = list(dict.fromkeys(emails))
+
+    with transaction.atomic():
+        found = set()
+        for chunk in _chunks(list_ids):
+            found.update(List.objects.filter(id__in=chunk).values_list(
+                'id', flat=True))
+        lists = [list_id for list_id in list_ids if list_id in found]
+
+        existing_users = set(User.objects.filter(
+            email__in=emails).values_list('email', flat=True))
+        new_users = [email for email in emails if email not in existing_users]
+        User.objects.bulk_create(User(email=email) for email in new_users)
+
+        existing_shares = set()
+        for chunk in _chunks(lists):
+            existing_shares.update(Share.objects.filter(
+                list_id__in=chunk, user_id__in=emails
+            ).values_list('list_id', 'user_id'))
+        new_shares = [
+            Share(list_id=list_id, user_id=email)
+            for list_id in lists for email in emails
+            if (list_id, email) not in existing_shares]
+        Share.objects.bulk_create(new_shares)
+        ListChange.objects.bulk_create(
+            ListChange(list_id=share.list_id, value=share.user_id,
+                       kind=ListChange.SHAREE_ADDED)
+            for share in new_shares)
+
+        changed = sorted({share.list_id for share in new_shares})
+        for chunk in _chunks(changed):
+            List.objects.filter(id__in=chunk).update(
+                version=uuid.uuid4(), updated_at=timezone.now())
+
+    return {
+        'lists': lists,
+        'missing_lists': [
+            list_id for list_id in list_ids if list_id not in found],
+        'users_created': new_users,
+        'shares_created': len(new_shares),
+        'shares_existing': len(existing_shares),
+        'lists_changed': changed,
+    }
@@ -3,4 +3,41 @@ window.Superlists.initialize = function (){
     $('input[name="text"]').on('keypress click', function () {
         $('.has-error').hide();
     });
+    window.Superlists.liveUpdates($('#id_list_table[data-changes-url]'));
+};
+
+window.Superlists.appendItems = function (table, changes) {
+    changes.forEach(function (change) {
+        if (change.kind !== 'item_added') {
+            return;
+        }
+        var number = table.data('offset') + table.find('tr').length + 1;
+        table.append($('<tr>').append($('<td>').text(number + '. ' + change.text)));
+    });
+};
+
+window.Superlists.liveUpdates = function (table) {
+    if (!table.length) {
+        return;
+    }
+    var container = table.closest('[data-poll-interval]');
+    var interval = container.data('poll-interval') * 1000;
+    var wait = container.data('poll-wait');
+
+    var poll = function () {
+        if (document.hidden) {
+            setTimeout(poll, interval);
+            return;
+        }
+        $.getJSON(table.data('changes-url'), {since: table.data('cursor'), wait: wait})
+            .done(function (data) {
+                window.Superlists.appendItems(table, data.changes);
+                table.data('cursor', data.cursor);
+                setTimeout(poll, data.has_more ? 0 : interval);
+            })
+            .fail(function () {
+                setTimeout(poll, interval * 2);
+            });
+    };
+    setTimeout(poll, interval);
 };
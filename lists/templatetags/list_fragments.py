@@ -0,0 +1,43 @@
+from django import template
+from lists.fragments import get_or_render
+
+register = template.Library()
+
+
+class ListFragmentNode(template.Node):
+
+    def __init__(self, nodelist, name, list_var, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.list_var = list_var
+        self.vary_on = vary_on
+
+    def render(self, context):
+        list_ = self.list_var.resolve(context)
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        return get_or_render(
+            self.name, list_, lambda: self.nodelist.render(context), vary_on)
+
+
+@register.tag('listfragment')
+def do_listfragment(parser, token):
+    """
+    Cache a fragment of a list's page until the list next changes::
+
+        {% listfragment 'items' list page.page_size %}
+            ...
+        {% endlistfragment %}
+    """
+    nodelist = parser.parse(('endlistfragment',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{tokens[0]}' tag requires a fragment name and a list.")
+    name = tokens[1]
+    if not (name[0] == name[-1] and name[0] in ('"', "'")):
+        raise template.TemplateSyntaxError(
+            f"'{tokens[0]}' fragment name must be quoted.")
+    return ListFragmentNode(
+        nodelist, name[1:-1], parser.compile_filter(tokens[2]),
+        [parser.compile_filter(var) for var in tokens[3:]])
@@ -0,0 +1,39 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from lists.models import Item, List
+
+
+class RepairListCountersTest(TestCase):
+
+    def test_recomputes_counts_and_titles_in_batches(self):
+        lists = [List.create_new(first_item_text=f'list {n}') for n in range(5)]
+        Item.objects.filter(list=lists[0]).delete()
+        Item.objects.bulk_create(
+            [Item(list=lists[1], text=f'extra {n}') for n in range(3)])
+        List.objects.update(item_count=99, title='stale')
+
+        out = StringIO()
+        call_command('repair_list_counters', '--batch-size=2', stdout=out)
+
+        self.assertIn('repaired 5 lists', out.getvalue())
+        self.assertEqual(
+            list(List.objects.order_by('id').values_list('item_count', 'title')),
+            [(0, ''), (4, 'list 1'), (1, 'list 2'), (1, 'list 3'),
+             (1, 'list 4')])
+
+    def test_changes_version_of_repaired_lists_only(self):
+        stale = List.create_new(first_item_text='stale')
+        fine = List.create_new(first_item_text='fine')
+        List.objects.filter(id=stale.id).update(item_count=5)
+        versions = dict(List.objects.values_list('id', 'version'))
+
+        out = StringIO()
+        call_command('repair_list_counters', stdout=out)
+
+        self.assertIn('repaired 1 lists', out.getvalue())
+        stale.refresh_from_db()
+        fine.refresh_from_db()
+        self.assertEqual(stale.item_count, 1)
+        self.assertNotEqual(stale.version, versions[stale.id])
+        self.assertEqual(fine.version, versions[fine.id])
@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+import re
+from unittest.mock import patch
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from lists.export import export_rows
+from lists.models import Item, List
+User = get_user_model()
+
+
+class ExportRowsTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(email='a@b.com')
+        self.other = User.objects.create(email='c@d.com')
+        self.owned = List.create_new(first_item_text='one', owner=self.user)
+        self.owned.add_items(['two', 'three'])
+        self.empty = List.objects.create(owner=self.user)
+        self.shared = List.create_new(first_item_text='theirs',
+                                      owner=self.other)
+        self.shared.shared_with.add(self.user)
+        List.create_new(first_item_text='private', owner=self.other)
+
+    def test_exports_owned_and_shared_lists_in_order(self):
+        items = {item.text: item.id for item in Item.objects.all()}
+        self.assertEqual(list(export_rows(self.user)), [
+            (self.owned.id, 'one', 'a@b.com', items['one'], 'one'),
+            (self.owned.id, 'one', 'a@b.com', items['two'], 'two'),
+            (self.owned.id, 'one', 'a@b.com', items['three'], 'three'),
+            (self.empty.id, '', 'a@b.com', None, None),
+            (self.shared.id, 'theirs', 'c@d.com', items['theirs'], 'theirs'),
+        ])
+
+    def test_small_batches_give_the_same_rows(self):
+        self.assertEqual(list(export_rows(self.user, batch_size=1)),
+                         list(export_rows(self.user)))
+
+    def test_queries_grow_with_batches_not_rows(self):
+        self.owned.add_items([f'item {n}' for n in range(500)])
+        with self.assertNumQueries(3):
+            rows = list(export_rows(self.user, batch_size=1000))
+        self.assertEqual(len(rows), 505)
+
+    @patch('lists.export.IN_QUERY_CHUNK_SIZE', 2)
+    def test_list_batches_stay_within_in_query_chunk_size(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(export_rows(self.user, batch_size=1000))
+        self.assertEqual(rows, list(export_rows(self.user)))
+        in_lists = [re.search(r'"list_id" IN \(([^)]*)\)', query['sql'])
+                    for query in queries.captured_queries]
+        self.assertTrue(any(in_lists))
+        for in_list in filter(None, in_lists):
+            self.assertLessEqual(len(in_list.group(1).split(',')), 2)
+
+
+class ExportViewTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(email='a@b.com')
+        List.create_new(first_item_text='one, with "quotes"', owner=self.user)
+
+    def test_streams_csv_for_logged_in_user(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/lists/users/a@b.com/export.csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ['list_id', 'list_title', 'owner',
+                                   'item_id', 'text'])
+        self.assertEqual(rows[1][4], 'one, with "quotes"')
+
+    def test_streams_json_lines(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/lists/users/a@b.com/export.jsonl')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(json.loads(lines[0])['text'], 'one, with "quotes"')
+
+    def test_other_users_cannot_export(self):
+        self.client.force_login(User.objects.create(email='c@d.com'))
+        response = self.client.get('/lists/users/a@b.com/export.csv')
+        self.assertEqual(response.status_code, 403)
+        self.client.logout()
+        response = self.client.get('/lists/users/a@b.com/export.csv')
+        self.assertEqual(response.status_code, 403)
+
+
+class ExportCommandTest(TestCase):
+
+    def test_writes_jsonl_to_stdout(self):
+        user = User.objects.create(email='a@b.com')
+        List.create_new(first_item_text='one', owner=user)
+        out = io.StringIO()
+        call_command('export_lists', 'a@b.com', '--format=jsonl', stdout=out)
+        self.assertEqual(
+            [json.loads(line)['text'] for line in out.getvalue().splitlines()],
+            ['one'])
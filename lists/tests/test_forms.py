@@ -35,9 +35,18 @@ class ExistingItemFormTest(TestCase):
         item = Item.objects.create(list=list_, text="duplicate")
         form = ExistingListItemForm(
             for_list=list_, data={'text': 'duplicate', })
-        self.assertFalse(form.is_valid())
+        self.assertTrue(form.is_valid())
+        self.assertIsNone(form.save())
         self.assertEqual(form.errors['text'], [
                          "You've already got that on your list"])
+        self.assertEqual(Item.objects.count(), 1)
+
+    def test_form_save_does_not_check_for_duplicates_first(self):
+        list_ = List.objects.create()
+        form = ExistingListItemForm(for_list=list_, data={'text': 'new'})
+        self.assertTrue(form.is_valid())
+        with self.assertNumQueries(0):
+            form.validate_unique()
 
     def test_form_save(self):
         list_ = List.objects.create()
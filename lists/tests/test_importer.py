@@ -0,0 +1,140 @@
+import io
+import json
+import tempfile
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from lists.export import csv_lines, export_rows
+from lists.importer import ImportFileError, Importer, import_lists, read_jsonl
+from lists.models import Item, List
+User = get_user_model()
+
+CSV_HEADER = 'list_id,list_title,owner,item_id,text\n'
+
+
+def csv_file(*rows):
+    return io.StringIO(CSV_HEADER + ''.join(
+        f'{list_id},,{owner},,{text}\n' for list_id, owner, text in rows))
+
+
+class ImportListsTest(TestCase):
+
+    def test_creates_lists_items_and_owners(self):
+        totals = import_lists(csv_file(
+            ('a', 'x@y.com', 'one'), ('a', 'x@y.com', 'two'),
+            ('b', '', 'three')), 'csv')
+        self.assertEqual((totals['lists'], totals['items']), (2, 3))
+        first, second = List.objects.order_by('id')
+        self.assertEqual(first.owner.email, 'x@y.com')
+        self.assertIsNone(second.owner)
+        self.assertEqual((first.title, first.item_count), ('one', 2))
+        self.assertEqual((second.title, second.item_count), ('three', 1))
+
+    def test_skips_duplicates_within_and_across_batches(self):
+        totals = import_lists(csv_file(
+            ('a', '', 'one'), ('a', '', 'two'), ('a', '', 'one'),
+            ('b', '', 'one'), ('a', '', 'two'), ('a', '', '')),
+            'csv', batch_size=2)
+        self.assertEqual(totals['items'], 3)
+        self.assertEqual(totals['duplicates'], 2)
+        self.assertEqual(Item.objects.count(), 3)
+
+    def test_changes_version_of_lists_grown_by_later_batches(self):
+        versions = []
+        import_lists(
+            csv_file(*[('a', '', f'item {n}') for n in range(5)]), 'csv',
+            batch_size=2, progress=lambda totals, elapsed: versions.append(
+                List.objects.get().version))
+        versions.append(List.objects.get().version)
+        self.assertEqual(len(set(versions)), len(versions))
+
+    def test_owner_overrides_the_owner_column(self):
+        owner = User.objects.create(email='me@y.com')
+        import_lists(csv_file(('a', 'x@y.com', 'one')), 'csv', owner=owner)
+        self.assertEqual(List.objects.get().owner, owner)
+        self.assertFalse(User.objects.filter(email='x@y.com').exists())
+
+    def test_round_trips_an_export(self):
+        user = User.objects.create(email='x@y.com')
+        List.create_new(first_item_text='one', owner=user).add_items(['two'])
+        List.objects.create(owner=user)
+        exported = ''.join(csv_lines(export_rows(user)))
+        List.objects.all().delete()
+
+        import_lists(io.StringIO(exported), 'csv')
+
+        self.assertEqual(
+            [(list_.title, list_.item_count)
+             for list_ in List.objects.order_by('id')], [('one', 2), ('', 0)])
+
+    def test_reads_json_lines(self):
+        lines = io.StringIO(
+            json.dumps({'list_id': 1, 'text': 'one'}) + '\n\n' +
+            json.dumps({'list_id': 1, 'text': 'two'}) + '\n')
+        self.assertEqual(import_lists(lines, 'jsonl')['items'], 2)
+
+    def test_queries_do_not_grow_with_rows(self):
+        rows = [('a', '', f'item {n}') for n in range(400)]
+        with self.assertNumQueries(10):
+            import_lists(csv_file(*rows), 'csv')
+
+    def test_rejects_files_without_the_columns(self):
+        with self.assertRaises(ImportFileError):
+            import_lists(io.StringIO('name,item\nx,y\n'), 'csv')
+        with self.assertRaises(ImportFileError):
+            import_lists(io.StringIO('{"text": "no list"}\n'), 'jsonl')
+
+    def test_repairs_counters_of_batches_before_a_bad_row(self):
+        lines = io.StringIO(''.join(
+            json.dumps({'list_id': 1, 'text': f'item {n}'}) + '\n'
+            for n in range(3)) + 'not json\n')
+        importer = Importer(batch_size=2)
+        with self.assertRaises(ImportFileError):
+            importer.run(read_jsonl(lines))
+        self.assertEqual(importer.totals['items'], 2)
+        list_ = List.objects.get()
+        self.assertEqual((list_.title, list_.item_count), ('item 0', 2))
+
+
+class ImportViewTest(TestCase):
+
+    def upload(self, content, name='lists.csv'):
+        return self.client.post('/lists/import', {
+            'file': SimpleUploadedFile(name, content.encode('utf-8'))})
+
+    def test_imports_lists_for_logged_in_user(self):
+        user = User.objects.create(email='me@y.com')
+        self.client.force_login(user)
+        response = self.upload(CSV_HEADER + 'a,,x@y.com,,one\n')
+        self.assertEqual(response.json()['items'], 1)
+        self.assertEqual(List.objects.get().owner, user)
+
+    def test_rejects_anonymous_users(self):
+        response = self.upload(CSV_HEADER + 'a,,,,one\n')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(List.objects.count(), 0)
+
+    def test_reports_what_was_imported_before_a_bad_row(self):
+        self.client.force_login(User.objects.create(email='me@y.com'))
+        response = self.upload('{"list_id": 1, "text": "one"}\nbad\n',
+                               name='lists.jsonl')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Line 2', response.json()['error'])
+        self.assertEqual(response.json()['imported']['rows'], 0)
+
+    def test_rejects_unknown_formats(self):
+        self.client.force_login(User.objects.create(email='me@y.com'))
+        response = self.upload('a', name='lists.xlsx')
+        self.assertEqual(response.status_code, 400)
+
+
+class ImportCommandTest(TestCase):
+
+    def test_reports_totals(self):
+        with tempfile.NamedTemporaryFile(
+                'w', suffix='.csv', delete=False) as source:
+            source.write(CSV_HEADER + 'a,,,,one\na,,,,one\n')
+        out = io.StringIO()
+        call_command('import_lists', source.name, stdout=out)
+        self.assertIn('imported 1 lists, 1 items from 2 rows', out.getvalue())
@@ -1,6 +1,9 @@
+from unittest.mock import patch
+from django.db import DatabaseError
 from django.test import TestCase
 from django.core.exceptions import ValidationError
-from lists.models import Item, List
+from lists.models import (Item, List, ListChange, ITEM_CREATED,
+                          ITEM_DUPLICATE, ITEM_EMPTY)
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
@@ -40,6 +43,78 @@ class ListModelTest(TestCase):
         Item.objects.create(text='second item', list=list_)
         self.assertEqual(list_.name, 'first item')
 
+    def test_list_name_is_stored_on_list(self):
+        list_ = List.create_new(first_item_text='first item')
+        Item.objects.create(text='second item', list=list_)
+        self.assertEqual(List.objects.get(id=list_.id).title, 'first item')
+
+    def test_list_name_follows_edits_to_first_item(self):
+        list_ = List.create_new(first_item_text='first item')
+        item = list_.item_set.first()
+        item.text = 'edited item'
+        item.save()
+        self.assertEqual(List.objects.get(id=list_.id).name, 'edited item')
+
+    def test_list_name_falls_back_to_next_item_when_first_deleted(self):
+        list_ = List.create_new(first_item_text='first item')
+        Item.objects.create(text='second item', list=list_)
+        list_.item_set.first().delete()
+        self.assertEqual(List.objects.get(id=list_.id).name, 'second item')
+
+    def test_add_items_reports_status_per_item(self):
+        list_ = List.create_new(first_item_text='existing')
+        results = list_.add_items(['new', 'existing', '', 'new', 'other'])
+        self.assertEqual(results, [
+            ('new', ITEM_CREATED),
+            ('existing', ITEM_DUPLICATE),
+            ('', ITEM_EMPTY),
+            ('new', ITEM_DUPLICATE),
+            ('other', ITEM_CREATED),
+        ])
+        self.assertEqual(
+            [item.text for item in list_.item_set.all()],
+            ['existing', 'new', 'other'])
+
+    def test_add_items_uses_a_fixed_number_of_queries(self):
+        list_ = List.create_new(first_item_text='existing')
+        with self.assertNumQueries(8):
+            list_.add_items([f'item {n}' for n in range(200)])
+        self.assertEqual(list_.item_set.count(), 201)
+
+    def test_add_items_sets_title_of_empty_list(self):
+        list_ = List.objects.create()
+        list_.add_items(['first', 'second'])
+        self.assertEqual(List.objects.get(id=list_.id).name, 'first')
+
+    def test_version_changes_when_items_are_added(self):
+        list_ = List.create_new(first_item_text='first')
+        version = List.objects.get(id=list_.id).version
+        Item.objects.create(list=list_, text='second')
+        self.assertNotEqual(List.objects.get(id=list_.id).version, version)
+        version = list_.version
+        list_.add_items(['third'])
+        self.assertNotEqual(List.objects.get(id=list_.id).version, version)
+
+    def test_version_unchanged_when_bulk_add_creates_nothing(self):
+        list_ = List.create_new(first_item_text='first')
+        version = List.objects.get(id=list_.id).version
+        list_.add_items(['first'])
+        self.assertEqual(List.objects.get(id=list_.id).version, version)
+
+    def test_item_count_tracks_items(self):
+        list_ = List.create_new(first_item_text='first')
+        Item.objects.create(list=list_, text='second')
+        list_.add_items(['third', 'fourth', 'first'])
+        self.assertEqual(List.objects.get(id=list_.id).item_count, 4)
+        list_.item_set.last().delete()
+        self.assertEqual(List.objects.get(id=list_.id).item_count, 3)
+
+    def test_updated_at_moves_when_items_added(self):
+        list_ = List.create_new(first_item_text='first')
+        before = List.objects.get(id=list_.id).updated_at
+        Item.objects.create(list=list_, text='second')
+        self.assertGreater(List.objects.get(id=list_.id).updated_at, before)
+
     def test_adding_user_to_shared_with_saves_user_to_list(self):
         list_ = List.objects.create()
         correct_user = User.objects.create(email='a@b.com')
@@ -105,3 +180,56 @@ class ItemModelTest(TestCase):
     def test_item_string_representation(self):
         item = Item(text='Some text')
         self.assertEqual(str(item), 'Some text')
+
+
+class ListChangeTest(TestCase):
+
+    def changes(self, list_):
+        return list(list_.changes.values_list('kind', 'item_id', 'value'))
+
+    def test_records_owner_and_items_of_new_list(self):
+        owner = User.objects.create(email='a@b.com')
+        list_ = List.create_new(first_item_text='first', owner=owner)
+        item = list_.item_set.get()
+        self.assertEqual(self.changes(list_), [
+            (ListChange.OWNER_SET, None, 'a@b.com'),
+            (ListChange.ITEM_ADDED, item.id, 'first'),
+        ])
+
+    def test_records_bulk_added_items_with_their_ids(self):
+        list_ = List.objects.create()
+        list_.add_items(['one', 'two', 'one'])
+        self.assertEqual(self.changes(list_), [
+            (ListChange.ITEM_ADDED, item.id, item.text)
+            for item in list_.item_set.all()])
+
+    def test_records_edited_and_removed_items(self):
+        list_ = List.create_new(first_item_text='first')
+        item = list_.item_set.get()
+        item_id = item.id
+        item.text = 'edited'
+        item.save()
+        item.delete()
+        self.assertEqual(self.changes(list_)[1:], [
+            (ListChange.ITEM_CHANGED, item_id, 'edited'),
+            (ListChange.ITEM_REMOVED, item_id, ''),
+        ])
+
+    def test_failed_change_log_rolls_back_the_item(self):
+        list_ = List.create_new(first_item_text='first')
+        item = list_.item_set.get()
+        failing = patch.object(ListChange.objects, 'create',
+                               side_effect=DatabaseError)
+        with failing, self.assertRaises(DatabaseError):
+            item.delete()
+        with patch.object(ListChange.objects, 'bulk_create',
+                          side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                Item.objects.create(list=list_, text='second')
+            with self.assertRaises(DatabaseError):
+                List.create_new(first_item_text='other')
+        self.assertEqual(List.objects.count(), 1)
+        list_ = List.objects.get()
+        self.assertEqual(list_.item_count, 1)
+        self.assertEqual(list(list_.item_set.values_list('text', flat=True)),
+                         ['first'])
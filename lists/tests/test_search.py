@@ -0,0 +1,95 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from lists.models import Item, List
+from lists.search import match_expression, search_items
+
+User = get_user_model()
+
+
+class MatchExpressionTest(TestCase):
+
+    def test_quotes_words_and_prefixes_last(self):
+        self.assertEqual(match_expression('buy milk'), '"buy" "milk"*')
+
+    def test_ignores_fts_syntax(self):
+        self.assertEqual(match_expression('milk" OR -x*'), '"milk" "OR" "x"*')
+
+    def test_empty_query(self):
+        self.assertIsNone(match_expression(' ?! '))
+
+
+class SearchItemsTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(email='edith@example.com')
+        self.owned = List.create_new(first_item_text='buy milk', owner=self.user)
+        self.shared = List.create_new(first_item_text='buy peacock feathers')
+        self.shared.shared_with.add(self.user)
+        self.other = List.create_new(first_item_text='buy milk elsewhere')
+
+    def texts(self, query):
+        return [item.text for item in search_items(self.user, query)]
+
+    def test_finds_items_in_owned_and_shared_lists_only(self):
+        self.assertCountEqual(self.texts('buy'),
+                              ['buy milk', 'buy peacock feathers'])
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.texts('buy feathers'), ['buy peacock feathers'])
+
+    def test_last_word_matches_as_prefix(self):
+        self.assertEqual(self.texts('peac'), ['buy peacock feathers'])
+
+    def test_ranks_closer_matches_first(self):
+        Item.objects.create(list=self.owned,
+                            text='milk milk milk')
+        self.assertEqual(self.texts('milk')[0], 'milk milk milk')
+
+    def test_index_follows_edits_and_deletes(self):
+        item = self.owned.item_set.first()
+        item.text = 'buy cheese'
+        item.save()
+        self.assertEqual(self.texts('cheese'), ['buy cheese'])
+        self.assertEqual(self.texts('milk'), [])
+        item.delete()
+        self.assertEqual(self.texts('cheese'), [])
+
+    def test_bulk_added_items_are_indexed(self):
+        self.owned.add_items(['walk the dog'])
+        self.assertEqual(self.texts('dog'), ['walk the dog'])
+
+    @override_settings(SEARCH_LIST_FILTER_MAX=1)
+    def test_users_with_many_lists_are_filtered_after_matching(self):
+        self.assertCountEqual(self.texts('buy'),
+                              ['buy milk', 'buy peacock feathers'])
+        self.assertEqual(self.texts('peac'), ['buy peacock feathers'])
+
+    def test_list_ids_do_not_match_text(self):
+        Item.objects.create(list=self.owned, text=str(self.other.id))
+        self.assertEqual(self.texts(str(self.owned.id)), [])
+        with self.settings(SEARCH_LIST_FILTER_MAX=0):
+            self.assertEqual(self.texts(str(self.owned.id)), [])
+
+    def test_user_without_lists_finds_nothing(self):
+        stranger = User.objects.create(email='stranger@example.com')
+        self.assertEqual(search_items(stranger, 'buy'), [])
+
+    def test_results_carry_list_title(self):
+        result = search_items(self.user, 'peacock')[0]
+        self.assertEqual(result.list_id, self.shared.id)
+        self.assertEqual(result.list_title, 'buy peacock feathers')
+
+
+class SearchViewTest(TestCase):
+
+    def test_redirects_anonymous_users_home(self):
+        response = self.client.get('/lists/search?q=milk')
+        self.assertRedirects(response, '/')
+
+    def test_renders_results_with_list_links(self):
+        user = User.objects.create(email='edith@example.com')
+        list_ = List.create_new(first_item_text='buy milk', owner=user)
+        self.client.force_login(user)
+        response = self.client.get('/lists/search?q=milk')
+        self.assertTemplateUsed(response, 'search.html')
+        self.assertContains(response, f'href="/lists/{list_.id}/"')
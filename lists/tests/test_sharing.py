@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from lists.models import List
+from lists.sharing import share_lists
+User = get_user_model()
+
+
+class ShareListsTest(TestCase):
+
+    def setUp(self):
+        self.lists = [List.create_new(first_item_text=f'list {n}')
+                      for n in range(3)]
+        self.ids = [list_.id for list_ in self.lists]
+
+    def test_shares_every_list_with_every_email(self):
+        result = share_lists(self.ids, ['a@b.com', 'c@d.com'])
+        self.assertEqual(result['shares_created'], 6)
+        for list_ in self.lists:
+            self.assertEqual(
+                sorted(list_.shared_with.values_list('email', flat=True)),
+                ['a@b.com', 'c@d.com'])
+
+    def test_creates_only_missing_users(self):
+        User.objects.create(email='a@b.com')
+        result = share_lists(self.ids, ['a@b.com', 'c@d.com', 'c@d.com'])
+        self.assertEqual(result['users_created'], ['c@d.com'])
+        self.assertEqual(User.objects.count(), 2)
+
+    def test_skips_existing_shares_and_touches_changed_lists(self):
+        user = User.objects.create(email='a@b.com')
+        self.lists[0].shared_with.add(user)
+        versions = dict(List.objects.values_list('id', 'version'))
+
+        result = share_lists(self.ids, ['a@b.com'])
+
+        self.assertEqual(result['shares_created'], 2)
+        self.assertEqual(result['shares_existing'], 1)
+        self.assertEqual(result['lists_changed'], self.ids[1:])
+        after = dict(List.objects.values_list('id', 'version'))
+        self.assertEqual(after[self.ids[0]], versions[self.ids[0]])
+        self.assertNotEqual(after[self.ids[1]], versions[self.ids[1]])
+
+    def test_reports_missing_lists(self):
+        result = share_lists([self.ids[0], 999], ['a@b.com'])
+        self.assertEqual(result['lists'], [self.ids[0]])
+        self.assertEqual(result['missing_lists'], [999])
+
+    def test_query_count_does_not_grow_with_lists_or_emails(self):
+        more = [List.objects.create().id for _ in range(20)]
+        emails = [f'user{n}@example.com' for n in range(20)]
+        with self.assertNumQueries(11):
+            share_lists(self.ids + more, emails)
@@ -1,15 +1,22 @@
+import json
 import unittest
 from django.contrib.auth import get_user_model
 from unittest.mock import patch, Mock
 User = get_user_model()
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from unittest import skip
 from lists.models import Item, List
+from lists.pagination import paginate
 from lists.forms import (ItemForm, EMPTY_ITEM_ERROR,
                          DUPLICATE_ITEM_ERROR, ExistingListItemForm)
 from django.utils.html import escape
 from django.http import HttpRequest
 from lists.views import new_list
+from lists import fragments
 
 
 class HomePageTest(TestCase):
@@ -225,6 +232,328 @@ class ListViewTest(TestCase):
         self.assertEqual(Item.objects.all().count(), 1)
 
 
+@override_settings(LIST_PAGE_SIZE=2)
+class ListPaginationTest(TestCase):
+
+    def setUp(self):
+        self.list_ = List.objects.create()
+        self.items = [Item.objects.create(list=self.list_, text=f'item {n}')
+                      for n in range(1, 6)]
+
+    def test_first_page_shows_page_size_items(self):
+        response = self.client.get(f'/lists/{self.list_.id}/')
+        self.assertEqual(response.context['page'].items, self.items[:2])
+        self.assertContains(response, f'?after={self.items[1].id}&amp;start=2')
+        self.assertNotContains(response, 'id_previous_page')
+
+    def test_after_cursor_continues_numbering(self):
+        response = self.client.get(
+            f'/lists/{self.list_.id}/?after={self.items[1].id}&start=2')
+        self.assertEqual(response.context['page'].items, self.items[2:4])
+        self.assertContains(response, '3. item 3')
+        self.assertContains(
+            response, f'?before={self.items[2].id}&amp;start=2')
+        self.assertContains(response, f'?after={self.items[3].id}&amp;start=4')
+
+    def test_before_cursor_continues_numbering(self):
+        response = self.client.get(
+            f'/lists/{self.list_.id}/?before={self.items[2].id}&start=2')
+        self.assertContains(response, '1. item 1')
+        self.assertContains(response, f'?after={self.items[1].id}&amp;start=2')
+
+    def test_empty_page_before_first_item(self):
+        for before in (self.items[0].id, 1):
+            response = self.client.get(
+                f'/lists/{self.list_.id}/?before={before}')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['page'].items, [])
+            self.assertNotContains(response, 'id_next_page')
+
+    def test_ignores_cursors_out_of_integer_range(self):
+        for cursor in ('after', 'before'):
+            response = self.client.get(
+                f'/lists/{self.list_.id}/?{cursor}={10 ** 23}')
+            self.assertEqual(response.context['page'].items, self.items[:2])
+
+    def test_failed_query_is_raised_again_on_next_access(self):
+        queryset = Mock()
+        queryset.order_by.side_effect = DatabaseError('boom')
+        page = paginate(queryset)
+        for _ in range(2):
+            with self.assertRaisesRegex(DatabaseError, 'boom'):
+                page.has_next
+
+    def test_empty_page_after_last_item(self):
+        response = self.client.get(
+            f'/lists/{self.list_.id}/?after={self.items[4].id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'id_previous_page')
+
+    def test_before_cursor_returns_preceding_page(self):
+        response = self.client.get(
+            f'/lists/{self.list_.id}/?before={self.items[4].id}')
+        page = response.context['page']
+        self.assertEqual(page.items, self.items[2:4])
+        self.assertTrue(page.has_previous)
+        self.assertTrue(page.has_next)
+
+    def test_last_page_has_no_next_link(self):
+        response = self.client.get(
+            f'/lists/{self.list_.id}/?after={self.items[3].id}')
+        self.assertEqual(response.context['page'].items, self.items[4:])
+        self.assertNotContains(response, 'id_next_page')
+
+    def test_last_page_polls_for_new_items_from_current_cursor(self):
+        response = self.client.get(
+            f'/lists/{self.list_.id}/?after={self.items[3].id}')
+        self.assertContains(
+            response, f'data-changes-url="/lists/{self.list_.id}/changes"')
+        self.assertContains(
+            response, f'data-cursor="{self.list_.change_cursor()}"')
+
+    def test_cursor_is_read_before_items(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/lists/{self.list_.id}/')
+        tables = [query['sql'].split(' FROM ')[1].split()[0]
+                  for query in queries.captured_queries[1:3]]
+        self.assertEqual(tables, ['"lists_listchange"', '"lists_item"'])
+
+    def test_earlier_pages_do_not_poll(self):
+        response = self.client.get(f'/lists/{self.list_.id}/')
+        self.assertNotContains(response, 'data-changes-url')
+
+    @override_settings(LIST_MAX_PAGE_SIZE=3)
+    def test_page_size_can_be_requested_up_to_maximum(self):
+        response = self.client.get(
+            f'/lists/{self.list_.id}/?page_size=50')
+        self.assertEqual(len(response.context['page'].items), 3)
+
+    def test_query_count_does_not_depend_on_list_size(self):
+        url = f'/lists/{self.list_.id}/?after={self.items[0].id}&start=1'
+        with self.assertNumQueries(4):
+            self.client.get(url)
+        for n in range(20):
+            Item.objects.create(list=self.list_, text=f'more {n}')
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+
+class AddItemsTest(TestCase):
+
+    def post_items(self, list_, items, **kwargs):
+        return self.client.post(
+            f'/lists/{list_.id}/items', data=json.dumps({'items': items}),
+            content_type='application/json', **kwargs)
+
+    def test_creates_items_and_reports_results(self):
+        list_ = List.create_new(first_item_text='existing')
+        response = self.post_items(list_, ['new', 'existing', ''])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [
+            {'text': 'new', 'status': 'created'},
+            {'text': 'existing', 'status': 'duplicate',
+             'error': DUPLICATE_ITEM_ERROR},
+            {'text': '', 'status': 'empty', 'error': EMPTY_ITEM_ERROR},
+        ])
+        self.assertEqual(list_.item_set.count(), 2)
+
+    def test_rejects_non_json_body(self):
+        list_ = List.objects.create()
+        response = self.client.post(
+            f'/lists/{list_.id}/items', data={'items': 'a'})
+        self.assertEqual(response.status_code, 415)
+
+    def test_rejects_malformed_payload(self):
+        list_ = List.objects.create()
+        response = self.post_items(list_, 'not a list')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Item.objects.count(), 0)
+
+    @override_settings(BULK_ITEMS_MAX=2)
+    def test_rejects_too_many_items(self):
+        list_ = List.objects.create()
+        response = self.post_items(list_, ['a', 'b', 'c'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Item.objects.count(), 0)
+
+    def test_404_for_missing_list(self):
+        response = self.client.post(
+            '/lists/999/items', data=json.dumps({'items': []}),
+            content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+
+
+class ListFragmentCacheTest(TestCase):
+
+    def test_repeat_view_serves_fragments_from_cache(self):
+        list_ = List.create_new(first_item_text='first')
+        self.client.get(f'/lists/{list_.id}/')
+        hits = fragments.stats['items', 'hit']
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/lists/{list_.id}/')
+        self.assertContains(response, '1. first')
+        self.assertEqual(fragments.stats['items', 'hit'], hits + 1)
+
+    def test_new_item_is_shown_after_cached_render(self):
+        list_ = List.create_new(first_item_text='first')
+        self.client.get(f'/lists/{list_.id}/')
+        self.client.post(f'/lists/{list_.id}/', data={'text': 'second'})
+        response = self.client.get(f'/lists/{list_.id}/')
+        self.assertContains(response, '2. second')
+
+    def test_new_sharee_is_shown_after_cached_render(self):
+        User.objects.create(email='a@b.com')
+        list_ = List.create_new(first_item_text='first')
+        self.client.get(f'/lists/{list_.id}/')
+        self.client.post(f'/lists/{list_.id}/share',
+                         data={'sharee': 'a@b.com'})
+        response = self.client.get(f'/lists/{list_.id}/')
+        self.assertContains(response, 'a@b.com')
+
+    def test_metrics_report_hits_and_misses(self):
+        list_ = List.create_new(first_item_text='first')
+        self.client.get(f'/lists/{list_.id}/')
+        response = self.client.get('/metrics')
+        self.assertContains(
+            response, 'list_fragment_cache_misses_total{fragment="items"}')
+
+
+class ListJSONTest(TestCase):
+
+    def test_returns_list_with_items_owner_and_sharees(self):
+        owner = User.objects.create(email='owner@b.com')
+        sharee = User.objects.create(email='sharee@b.com')
+        list_ = List.create_new(first_item_text='first', owner=owner)
+        Item.objects.create(list=list_, text='second')
+        list_.shared_with.add(sharee)
+        response = self.client.get(f'/lists/{list_.id}/json')
+        data = response.json()
+        self.assertEqual(data['name'], 'first')
+        self.assertEqual(data['owner'], 'owner@b.com')
+        self.assertEqual(data['shared_with'], ['sharee@b.com'])
+        self.assertEqual([item['text'] for item in data['items']],
+                         ['first', 'second'])
+
+    def test_sets_strong_etag_from_list_version(self):
+        list_ = List.create_new(first_item_text='first')
+        response = self.client.get(f'/lists/{list_.id}/json')
+        list_.refresh_from_db()
+        self.assertEqual(response['ETag'], f'"{list_.version.hex}"')
+
+    def test_matching_etag_returns_304_without_loading_list(self):
+        list_ = List.create_new(first_item_text='first')
+        etag = self.client.get(f'/lists/{list_.id}/json')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                f'/lists/{list_.id}/json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_after_item_added(self):
+        list_ = List.create_new(first_item_text='first')
+        etag = self.client.get(f'/lists/{list_.id}/json')['ETag']
+        self.client.post(f'/lists/{list_.id}/', data={'text': 'second'})
+        response = self.client.get(
+            f'/lists/{list_.id}/json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_changes_after_sharing(self):
+        list_ = List.create_new(first_item_text='first')
+        etag = self.client.get(f'/lists/{list_.id}/json')['ETag']
+        self.client.post(f'/lists/{list_.id}/share',
+                         data={'sharee': 'a@b.com'})
+        response = self.client.get(
+            f'/lists/{list_.id}/json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_404_for_missing_list(self):
+        response = self.client.get('/lists/999/json')
+        self.assertEqual(response.status_code, 404)
+
+
+class ListChangesTest(TestCase):
+
+    def get_changes(self, list_, **params):
+        return self.client.get(f'/lists/{list_.id}/changes', params).json()
+
+    def test_returns_changes_after_cursor(self):
+        list_ = List.create_new(first_item_text='first')
+        cursor = self.client.get(f'/lists/{list_.id}/json').json()['cursor']
+        item = Item.objects.create(list=list_, text='second')
+        self.client.post(f'/lists/{list_.id}/share',
+                         data={'sharee': 'a@b.com'})
+
+        data = self.get_changes(list_, since=cursor)
+
+        self.assertEqual(
+            [{key: value for key, value in change.items() if key != 'id'}
+             for change in data['changes']],
+            [{'kind': 'item_added', 'item': item.id, 'text': 'second'},
+             {'kind': 'sharee_added', 'email': 'a@b.com'}])
+        self.assertEqual(data['cursor'], data['changes'][-1]['id'])
+        self.assertFalse(data['has_more'])
+
+    def test_no_changes_keeps_cursor(self):
+        list_ = List.create_new(first_item_text='first')
+        cursor = self.get_changes(list_)['cursor']
+        data = self.get_changes(list_, since=cursor)
+        self.assertEqual(data['changes'], [])
+        self.assertEqual(data['cursor'], cursor)
+
+    def test_limit_pages_through_changes(self):
+        list_ = List.objects.create()
+        list_.add_items(['a', 'b', 'c'])
+        first = self.get_changes(list_, limit=2)
+        self.assertTrue(first['has_more'])
+        rest = self.get_changes(list_, since=first['cursor'], limit=2)
+        self.assertEqual([change['text'] for change in rest['changes']], ['c'])
+        self.assertFalse(rest['has_more'])
+
+    def test_query_count_does_not_depend_on_list_size(self):
+        list_ = List.objects.create()
+        list_.add_items([f'item {n}' for n in range(300)])
+        cursor = self.client.get(f'/lists/{list_.id}/json').json()['cursor']
+        Item.objects.create(list=list_, text='new')
+        with self.assertNumQueries(1):
+            data = self.get_changes(list_, since=cursor)
+        self.assertEqual(len(data['changes']), 1)
+
+    @override_settings(LIST_CHANGES_MAX_WAIT=0.05,
+                       LIST_CHANGES_POLL_INTERVAL=0.01)
+    def test_waits_for_changes_up_to_the_maximum(self):
+        list_ = List.create_new(first_item_text='first')
+        cursor = self.get_changes(list_)['cursor']
+        with patch('lists.views.time.sleep') as sleep:
+            sleep.side_effect = lambda seconds: Item.objects.create(
+                list=list_, text='second')
+            data = self.get_changes(list_, since=cursor, wait=30)
+        sleep.assert_called_once_with(0.01)
+        self.assertEqual(data['changes'][0]['text'], 'second')
+
+    def test_does_not_wait_by_default(self):
+        list_ = List.create_new(first_item_text='first')
+        cursor = self.get_changes(list_)['cursor']
+        with patch('lists.views.time.sleep') as sleep:
+            data = self.get_changes(list_, since=cursor, wait=30)
+        sleep.assert_not_called()
+        self.assertEqual(data['changes'], [])
+
+    def test_rejects_bad_cursor(self):
+        list_ = List.objects.create()
+        response = self.client.get(f'/lists/{list_.id}/changes?since=x')
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_cursor_out_of_integer_range(self):
+        list_ = List.objects.create()
+        response = self.client.get(
+            f'/lists/{list_.id}/changes?since={10 ** 23}')
+        self.assertEqual(response.status_code, 400)
+
+    def test_404_for_missing_list(self):
+        response = self.client.get('/lists/999/changes')
+        self.assertEqual(response.status_code, 404)
+
+
 class MyListTests(TestCase):
     def test_my_list_url_renders_my_list_template(self):
         User.objects.create(email='a@b.com')
@@ -237,9 +566,66 @@ class MyListTests(TestCase):
         response = self.client.get('/lists/users/a@b.com/')
         self.assertEqual(response.context['owner'], correct_user)
 
+    def test_query_count_does_not_grow_with_number_of_lists(self):
+        owner = User.objects.create(email='a@b.com')
+        List.create_new(first_item_text='owned', owner=owner)
+        List.create_new(first_item_text='shared').shared_with.add(owner)
+        with self.assertNumQueries(3):
+            self.client.get('/lists/users/a@b.com/')
+
+        for n in range(10):
+            List.create_new(first_item_text=f'owned {n}', owner=owner)
+            List.create_new(first_item_text=f'shared {n}').shared_with.add(owner)
+        with self.assertNumQueries(3):
+            response = self.client.get('/lists/users/a@b.com/')
+        self.assertContains(response, 'owned 9')
+        self.assertContains(response, 'shared 9')
+
+
+class MyListsSortingTest(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create(email='a@b.com')
+        self.small = List.create_new(first_item_text='b small', owner=self.owner)
+        self.big = List.create_new(first_item_text='c big', owner=self.owner)
+        self.big.add_items(['more', 'items'])
+        self.recent = List.create_new(first_item_text='a recent', owner=self.owner)
+
+    def owned(self, query=''):
+        response = self.client.get(f'/lists/users/a@b.com/{query}')
+        return list(response.context['owned_lists'])
+
+    def test_defaults_to_most_recently_updated_first(self):
+        self.assertEqual(self.owned(), [self.recent, self.big, self.small])
+
+    def test_sort_by_item_count(self):
+        self.assertEqual(self.owned('?sort=items')[0], self.big)
+
+    def test_sort_by_name(self):
+        self.assertEqual(self.owned('?sort=name'),
+                         [self.recent, self.small, self.big])
+
+    def test_shows_item_counts(self):
+        response = self.client.get('/lists/users/a@b.com/')
+        self.assertContains(response, '3 items, updated')
+        self.assertContains(response, '1 item, updated')
+
 
 class ShareListTests(TestCase):
 
+    def setUp(self):
+        caches[settings.RATE_LIMIT_CACHE].clear()
+
+    @override_settings(RATE_LIMITS={'share': {'ip': (2, 60)}})
+    def test_rate_limits_sharing_from_one_ip(self):
+        list_ = List.objects.create()
+        for n in range(3):
+            User.objects.create(email=f'{n}@test.com')
+            response = self.client.post(
+                f'/lists/{list_.id}/share', data={'sharee': f'{n}@test.com'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(list_.shared_with.count(), 2)
+
     def test_POST_redirects_to_list_page(self):
         list_ = List.objects.create()
         response = self.client.post(
@@ -265,3 +651,64 @@ class ShareListTests(TestCase):
         self.assertContains(response, f'Lists shared with {user.email}')
         self.assertContains(response, f'{list_.name}')
 
+
+class BulkShareTest(TestCase):
+
+    def setUp(self):
+        caches[settings.RATE_LIMIT_CACHE].clear()
+
+    def post_share(self, lists, emails):
+        return self.client.post(
+            '/lists/share', data=json.dumps({'lists': lists, 'emails': emails}),
+            content_type='application/json')
+
+    def test_shares_lists_and_reports_changes(self):
+        list_ = List.create_new(first_item_text='test')
+        response = self.post_share([list_.id, 999], ['a@b.com'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['shares_created'], 1)
+        self.assertEqual(response.json()['missing_lists'], [999])
+        self.assertEqual(
+            list(list_.shared_with.values_list('email', flat=True)),
+            ['a@b.com'])
+
+    def test_rejects_invalid_emails(self):
+        list_ = List.objects.create()
+        response = self.post_share([list_.id], ['a@b.com', 'not-an-email'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['invalid_emails'], ['not-an-email'])
+        self.assertEqual(User.objects.count(), 0)
+
+    def test_rejects_malformed_payload(self):
+        response = self.post_share('1', ['a@b.com'])
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_list_ids_out_of_integer_range(self):
+        response = self.post_share([10 ** 30], ['a@b.com'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(User.objects.count(), 0)
+
+    def test_rejects_non_json_body(self):
+        response = self.client.post('/lists/share', data={'lists': '1'})
+        self.assertEqual(response.status_code, 415)
+
+    @override_settings(RATE_LIMITS={
+        'share': {'ip': (300, 60), 'email': (2, 60 * 60)}})
+    def test_each_email_is_rate_limited(self):
+        list_ = List.objects.create()
+        for _ in range(2):
+            self.post_share([list_.id], ['a@b.com', 'c@d.com'])
+        response = self.post_share([list_.id], ['e@f.com', 'A@b.com'])
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(RATE_LIMITS={'share': {'ip': (5, 60)}})
+    def test_ip_is_charged_per_email(self):
+        list_ = List.objects.create()
+        emails = [f'user{n}@b.com' for n in range(3)]
+        self.assertEqual(self.post_share([list_.id], emails).status_code, 200)
+        self.assertEqual(self.post_share([list_.id], emails).status_code, 429)
+
+    @override_settings(BULK_SHARE_MAX_EMAILS=1)
+    def test_rejects_too_many_emails(self):
+        response = self.post_share([], ['a@b.com', 'c@d.com'])
+        self.assertEqual(response.status_code, 400)
@@ -19,6 +19,14 @@ from lists import views
 urlpatterns = [
     url(r'^new$', views.new_list, name='new_list'),
     url(r'^(\d+)/$', views.view_list, name='view_list'),
+    url(r'^users/(.+)/export\.(csv|jsonl)$', views.export_lists,
+        name='export_lists'),
     url(r'^users/(.+)/$', views.my_lists, name='my_lists'),
+    url(r'^import$', views.import_lists_upload, name='import_lists'),
+    url(r'^search$', views.search, name='search'),
     url(r'^(\d+)/share$', views.share_list, name='share_list'),
+    url(r'^share$', views.bulk_share, name='bulk_share'),
+    url(r'^(\d+)/items$', views.add_items, name='add_items'),
+    url(r'^(\d+)/json$', views.list_json, name='list_json'),
+    url(r'^(\d+)/changes$', views.list_changes, name='list_changes'),
 ]
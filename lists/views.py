@@ -1,6 +1,25 @@
-from django.shortcuts import render, redirect
-from lists.models import List
-from lists.forms import ItemForm, ExistingListItemForm, NewListForm
+import io
+import json
+import time
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.http import (HttpResponseForbidden, JsonResponse,
+                         StreamingHttpResponse)
+from django.shortcuts import render, redirect, get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition, require_POST
+from lists import export
+from lists.models import (List, ListChange, ITEM_DUPLICATE, ITEM_EMPTY,
+                          MAX_ID)
+from lists.forms import (ItemForm, ExistingListItemForm, NewListForm,
+                         EMPTY_ITEM_ERROR, DUPLICATE_ITEM_ERROR)
+from lists.pagination import paginate, page_size_from
+from lists.importer import READERS, ImportFileError, Importer
+from lists.search import search_items
+from lists.sharing import share_lists
+from superlists.ratelimit import check_rate_limit, rate_limit
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
@@ -23,18 +42,252 @@ def view_list(request, list_id):
 
     if request.method == 'POST':
         form = ExistingListItemForm(for_list=list_, data=request.POST)
-        if form.is_valid():
-            form.save()
+        if form.is_valid() and form.save():
             return redirect(list_)
-    return render(request, 'list.html', {"list": list_, "form": form, })
+    # As in list_json, read the cursor before the items it is polled from.
+    cursor = list_.change_cursor()
+    page = paginate(list_.item_set.all(),
+                    after=request.GET.get('after'),
+                    before=request.GET.get('before'),
+                    page_size=request.GET.get('page_size'),
+                    start=request.GET.get('start'))
+    return render(request, 'list.html', {
+        "list": list_, "form": form, "page": page,
+        "live_updates": {
+            "cursor": cursor,
+            "interval": settings.LIST_LIVE_UPDATE_INTERVAL,
+            "wait": settings.LIST_CHANGES_MAX_WAIT,
+        },
+    })
+
+
+MY_LISTS_ORDERINGS = {
+    'updated': ('-updated_at', '-id'),
+    'items': ('-item_count', '-id'),
+    'name': ('title', 'id'),
+}
+MY_LISTS_SORT_CHOICES = (
+    ('updated', 'last updated'), ('items', 'size'), ('name', 'name'))
 
 
 def my_lists(request, email):
     owner = User.objects.get(email=email)
-    return render(request, 'my_lists.html', {'owner': owner, })
+    sort = request.GET.get('sort')
+    if sort not in MY_LISTS_ORDERINGS:
+        sort = 'updated'
+    ordering = MY_LISTS_ORDERINGS[sort]
+    return render(request, 'my_lists.html', {
+        'owner': owner,
+        'sort': sort,
+        'sort_choices': MY_LISTS_SORT_CHOICES,
+        'owned_lists': owner.list_set.order_by(*ordering),
+        'shared_lists': owner.shared.order_by(*ordering),
+    })
+
+
+def export_lists(request, email, format):
+    if not request.user.is_authenticated or request.user.email != email:
+        return HttpResponseForbidden()
+    render_lines, content_type = export.FORMATS[format]
+    rows = export.export_rows(
+        request.user, batch_size=settings.EXPORT_BATCH_SIZE)
+    response = StreamingHttpResponse(
+        export.chunked(render_lines(rows)), content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="lists-{email}.{format}"')
+    return response
+
+
+@require_POST
+def import_lists_upload(request):
+    if not request.user.is_authenticated:
+        return HttpResponseForbidden()
+    upload = request.FILES.get('file')
+    if upload is None:
+        return _json_error('Expected a "file" upload')
+    format = request.POST.get('format') or upload.name.rpartition('.')[2]
+    if format not in READERS:
+        return _json_error(f"Format must be one of {', '.join(READERS)}")
+    lines = io.TextIOWrapper(upload.file, encoding='utf-8', newline='')
+    importer = Importer(owner=request.user)
+    try:
+        totals = importer.run(READERS[format](lines))
+    except (ImportFileError, UnicodeDecodeError) as error:
+        # Batches before the bad row are already committed.
+        return JsonResponse(
+            {'error': str(error), 'imported': importer.totals}, status=400)
+    return JsonResponse(totals)
+
 
+def search(request):
+    if not request.user.is_authenticated:
+        return redirect('/')
+    query = request.GET.get('q', '')
+    return render(request, 'search.html', {
+        'query': query,
+        'results': search_items(request.user, query),
+    })
 
+
+@rate_limit('share', email_field='sharee')
 def share_list(request, list_id):
     list_ = List.objects.get(pk=list_id)
-    list_.shared_with.add(request.POST['sharee'])
+    with transaction.atomic():
+        list_.shared_with.add(request.POST['sharee'])
+        list_.sharees_added([request.POST['sharee']])
     return redirect(list_)
+
+
+def list_etag(request, list_id):
+    version = List.objects.filter(pk=list_id).values_list(
+        'version', flat=True).first()
+    if version:
+        return version.hex
+
+
+@condition(etag_func=list_etag)
+def list_json(request, list_id):
+    # Read the cursor first: a change landing in between is then both in
+    # the snapshot and replayed by the changes feed, never missed.
+    cursor = ListChange.objects.filter(list_id=list_id).values_list(
+        'id', flat=True).last() or 0
+    list_ = get_object_or_404(List, pk=list_id)
+    return JsonResponse({
+        'id': list_.id,
+        'cursor': cursor,
+        'name': list_.name,
+        'version': list_.version.hex,
+        'item_count': list_.item_count,
+        'updated_at': list_.updated_at,
+        'owner': list_.owner_id,
+        'shared_with': list(
+            list_.shared_with.values_list('email', flat=True)),
+        'items': [{'id': item_id, 'text': text} for item_id, text
+                  in list_.item_set.values_list('id', 'text')],
+    })
+
+
+def _change_json(change):
+    data = {'id': change.id, 'kind': change.kind}
+    if change.item_id is not None:
+        data['item'] = change.item_id
+    if change.kind in (ListChange.ITEM_ADDED, ListChange.ITEM_CHANGED):
+        data['text'] = change.value
+    elif change.kind in (ListChange.SHAREE_ADDED, ListChange.OWNER_SET):
+        data['email'] = change.value
+    return data
+
+
+def list_changes(request, list_id):
+    try:
+        since = max(int(request.GET.get('since', 0)), 0)
+        wait = float(request.GET.get('wait', 0))
+    except ValueError:
+        return _json_error('"since" and "wait" must be numbers')
+    if since > MAX_ID:
+        return _json_error('"since" is not a change id')
+    limit = page_size_from(request.GET.get('limit'))
+    # Long-polling holds the worker, so it is capped by a setting that
+    # stays at 0 unless the app runs on threaded workers.
+    deadline = time.monotonic() + max(
+        0, min(wait, settings.LIST_CHANGES_MAX_WAIT))
+    changes = list(ListChange.objects.filter(
+        list_id=list_id, id__gt=since)[:limit + 1])
+    if not changes:
+        get_object_or_404(List.objects.only('id'), pk=list_id)
+    while not changes and time.monotonic() < deadline:
+        time.sleep(settings.LIST_CHANGES_POLL_INTERVAL)
+        changes = list(ListChange.objects.filter(
+            list_id=list_id, id__gt=since)[:limit + 1])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    return JsonResponse({
+        'list': int(list_id),
+        'changes': [_change_json(change) for change in changes],
+        'cursor': changes[-1].id if changes else since,
+        'has_more': has_more,
+    })
+
+
+BULK_ITEM_ERRORS = {
+    ITEM_EMPTY: EMPTY_ITEM_ERROR,
+    ITEM_DUPLICATE: DUPLICATE_ITEM_ERROR,
+}
+
+
+def _json_error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+# Called by importers rather than browsers; a cross-site form cannot send
+# an application/json body, which is all this view accepts.
+@csrf_exempt
+@require_POST
+def add_items(request, list_id):
+    list_ = get_object_or_404(List, pk=list_id)
+    if request.content_type != 'application/json':
+        return _json_error('Expected an application/json body', status=415)
+    try:
+        texts = json.loads(request.body.decode('utf-8'))['items']
+    except (ValueError, KeyError, TypeError):
+        return _json_error('Expected a JSON object with an "items" list')
+    if not isinstance(texts, list) or not all(
+            isinstance(text, str) for text in texts):
+        return _json_error('"items" must be a list of strings')
+    if len(texts) > settings.BULK_ITEMS_MAX:
+        return _json_error(
+            f'At most {settings.BULK_ITEMS_MAX} items per request')
+
+    results = []
+    for text, status in list_.add_items([text.strip() for text in texts]):
+        result = {'text': text, 'status': status}
+        if status in BULK_ITEM_ERRORS:
+            result['error'] = BULK_ITEM_ERRORS[status]
+        results.append(result)
+    return JsonResponse({'list': list_.id, 'results': results})
+
+
+# JSON only, like add_items.
+@csrf_exempt
+@require_POST
+def bulk_share(request):
+    if request.content_type != 'application/json':
+        return _json_error('Expected an application/json body', status=415)
+    try:
+        payload = json.loads(request.body.decode('utf-8'))
+        list_ids, emails = payload['lists'], payload['emails']
+    except (ValueError, KeyError, TypeError):
+        return _json_error(
+            'Expected a JSON object with "lists" and "emails" lists')
+    if not isinstance(list_ids, list) or not all(
+            type(list_id) is int and abs(list_id) <= MAX_ID
+            for list_id in list_ids):
+        return _json_error('"lists" must be a list of list ids')
+    if not isinstance(emails, list) or not all(
+            isinstance(email, str) for email in emails):
+        return _json_error('"emails" must be a list of strings')
+    if len(list_ids) > settings.BULK_SHARE_MAX_LISTS:
+        return _json_error(
+            f'At most {settings.BULK_SHARE_MAX_LISTS} lists per request')
+    if len(emails) > settings.BULK_SHARE_MAX_EMAILS:
+        return _json_error(
+            f'At most {settings.BULK_SHARE_MAX_EMAILS} emails per request')
+    # Charged per address, as if each were shared through share_list.
+    limited = check_rate_limit('share', request, emails)
+    if limited:
+        return limited
+
+    emails = [email.strip() for email in emails]
+    invalid = []
+    for email in emails:
+        try:
+            validate_email(email)
+        except ValidationError:
+            invalid.append(email)
+    if invalid:
+        return JsonResponse(
+            {'error': 'Invalid email addresses', 'invalid_emails': invalid},
+            status=400)
+
+    return JsonResponse(share_lists(list_ids, emails))
+
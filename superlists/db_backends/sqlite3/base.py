@@ -0,0 +1,31 @@
+"""SQLite backend that applies PRAGMAs from OPTIONS['pragmas'] to every new
+connection, e.g. WAL journaling so readers don't block the writer, and
+starts atomic blocks with OPTIONS['transaction_mode'] (as later Django
+versions do).
+
+A plain (DEFERRED) BEGIN takes the write lock at the first write; if another
+connection committed since this transaction's first read, SQLite fails with
+"database is locked" at once instead of waiting out the busy timeout.
+IMMEDIATE takes the write lock up front, where the busy timeout applies."""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = params.pop('pragmas', {})
+        self.transaction_mode = params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        else:
+            super()._start_transaction_under_autocommit()
@@ -0,0 +1,78 @@
+"""Send reads of list data to replica databases and everything else, plus
+all writes, to the primary ('default').
+
+Only requests opt into replica reads, through ReplicaPinningMiddleware;
+management commands and scripts read what they write from the primary."""
+import random
+import threading
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICATED_APPS = {'lists'}
+PIN_COOKIE = 'pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_state = threading.local()
+
+
+def reading_from_replicas():
+    # Inside a transaction on the primary, reads must see its writes.
+    return (getattr(_state, 'replica_reads', False)
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block)
+
+
+def current_replica():
+    """The replica this request reads from. Replicas lag by different
+    amounts, so mixing them within a request could pair a list's version
+    with another replica's items."""
+    replica = getattr(_state, 'replica', None)
+    if replica not in settings.DATABASE_REPLICAS:
+        replica = _state.replica = random.choice(settings.DATABASE_REPLICAS)
+    return replica
+
+
+class PrimaryReplicaRouter(object):
+
+    def db_for_read(self, model, **hints):
+        if (not settings.DATABASE_REPLICAS or not reading_from_replicas()
+                or model._meta.app_label not in REPLICATED_APPS):
+            return 'default'
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Follow related objects to the database they were read from.
+            return instance._state.db
+        return current_replica()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas are copies of the primary, never migrated directly.
+        return db == 'default'
+
+
+class ReplicaPinningMiddleware(object):
+    """Read from the primary while handling a write, and for
+    REPLICA_PIN_SECONDS afterwards so the redirect that follows a POST
+    sees what it just wrote even if the replicas lag. Otherwise every
+    read in the request goes to the same replica."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writing = request.method not in SAFE_METHODS
+        _state.replica_reads = not (writing or PIN_COOKIE in request.COOKIES)
+        _state.replica = None
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.replica_reads = False
+            _state.replica = None
+        if writing and settings.DATABASE_REPLICAS:
+            response.set_cookie(PIN_COOKIE, '1', httponly=True,
+                                max_age=settings.REPLICA_PIN_SECONDS)
+        return response
@@ -0,0 +1,122 @@
+"""Per-view request metrics, kept in process and served in the Prometheus
+text exposition format."""
+import threading
+import time
+from collections import defaultdict
+from django.db import connections
+from django.http import HttpResponse
+from lists.fragments import render_stats
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500, 1000)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METRICS = (
+    ('http_request_duration_seconds', 'Wall time spent in the view stack.',
+     DURATION_BUCKETS),
+    ('http_request_db_queries', 'Database queries issued per request.',
+     QUERY_COUNT_BUCKETS),
+    ('http_request_db_duration_seconds', 'Time spent in database queries.',
+     DURATION_BUCKETS),
+    ('http_response_size_bytes', 'Size of non-streaming response bodies.',
+     SIZE_BUCKETS),
+)
+
+
+class Histogram(object):
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def samples(self, name, view):
+        for bound, count in zip(self.buckets, self.counts):
+            yield f'{name}_bucket{{view="{view}",le="{bound}"}} {count}'
+        yield f'{name}_bucket{{view="{view}",le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{view="{view}"}} {self.sum}'
+        yield f'{name}_count{{view="{view}"}} {self.count}'
+
+
+class Registry(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.histograms = {
+            name: defaultdict(lambda buckets=buckets: Histogram(buckets))
+            for name, _, buckets in METRICS}
+
+    def observe(self, view, **values):
+        with self.lock:
+            for name, value in values.items():
+                self.histograms[name][view].observe(value)
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for name, description, _ in METRICS:
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} histogram')
+                for view, histogram in sorted(self.histograms[name].items()):
+                    lines.extend(histogram.samples(name, view))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class MetricsMiddleware(object):
+    """Record wall time, query count and time, and response size per
+    resolved URL name.
+
+    Queries are counted through the connection's debug cursor, which Django
+    empties at the start of every request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        databases = connections.all()
+        forced = [db.force_debug_cursor for db in databases]
+        logged = [len(db.queries_log) for db in databases]
+        for db in databases:
+            db.force_debug_cursor = True
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            elapsed = time.perf_counter() - start
+            for db, force in zip(databases, forced):
+                db.force_debug_cursor = force
+
+        queries = [query for db, skip in zip(databases, logged)
+                   for query in list(db.queries_log)[skip:]]
+        values = {
+            'http_request_duration_seconds': elapsed,
+            'http_request_db_queries': len(queries),
+            'http_request_db_duration_seconds': sum(
+                float(query['time']) for query in queries),
+        }
+        if not response.streaming:
+            values['http_response_size_bytes'] = len(response.content)
+
+        match = request.resolver_match
+        registry.observe(match.url_name if match else 'unresolved', **values)
+        return response
+
+
+def metrics(request):
+    return HttpResponse(registry.render() + render_stats(),
+                        content_type='text/plain; version=0.0.4')
@@ -0,0 +1,102 @@
+"""Token-bucket rate limiting for expensive POST endpoints, keyed by client
+IP and by the email address a request acts on.
+
+Buckets live in the settings.RATE_LIMIT_CACHE cache so every worker sees
+the same counts. Reads and writes of a bucket are not atomic across
+workers, so a burst racing on one key may get a few extra requests
+through; that is fine for keeping abusers from swamping the site.
+"""
+import math
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+
+class TokenBucket(object):
+    """Holds up to `capacity` tokens and refills completely every
+    `period` seconds; each request takes one, or as many as it asks for."""
+
+    def __init__(self, name, capacity, period, cache):
+        self.name = name
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+        self.cache = cache
+
+    def consume(self, key, now=None, count=1):
+        """Take count tokens for key. Return the seconds to wait before
+        retrying, or 0 if the request may go ahead."""
+        now = time.time() if now is None else now
+        cache_key = f'ratelimit:{self.name}:{key}'
+        tokens, updated = self.cache.get(cache_key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        retry_after = 0
+        if tokens >= count:
+            tokens -= count
+        else:
+            retry_after = (count - tokens) / self.rate
+        # An unused bucket is full again after one period, same as a
+        # missing one, so let the cache drop it then.
+        self.cache.set(cache_key, (tokens, now), math.ceil(self.period))
+        return retry_after
+
+
+def client_ip(request):
+    header = settings.RATE_LIMIT_CLIENT_IP_HEADER
+    if header and request.META.get(header):
+        return request.META[header]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def buckets(scope):
+    cache = caches[settings.RATE_LIMIT_CACHE]
+    return {
+        kind: TokenBucket(f'{scope}:{kind}', capacity, period, cache)
+        for kind, (capacity, period) in settings.RATE_LIMITS[scope].items()}
+
+
+def too_many_requests(retry_after):
+    seconds = math.ceil(retry_after)
+    response = HttpResponse(
+        f'Too many requests, please try again in {seconds} seconds.\n',
+        status=429, content_type='text/plain')
+    response['Retry-After'] = str(seconds)
+    return response
+
+
+def check_rate_limit(scope, request, emails=()):
+    """Charge the client's IP a token per email (at least one) and each
+    email a token from settings.RATE_LIMITS[scope]. Return a 429 response
+    once one runs out, or None if the request may go ahead."""
+    emails = {email.strip().lower() for email in emails} - {''}
+    limits = buckets(scope)
+    charges = [('ip', client_ip(request), max(len(emails), 1))]
+    charges += [('email', email, 1) for email in sorted(emails)]
+    for kind, key, count in charges:
+        if not key or kind not in limits:
+            continue
+        retry_after = limits[kind].consume(key, count=count)
+        if retry_after:
+            return too_many_requests(retry_after)
+
+
+def rate_limit(scope, email_field=None):
+    """Reject POSTs to the view with 429 once the client's IP, or the email
+    in POST[email_field], runs out of tokens in settings.RATE_LIMITS[scope].
+    The check runs before the view, so rejected requests cost no database
+    or SMTP work."""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method == 'POST':
+                emails = []
+                if email_field:
+                    emails.append(request.POST.get(email_field, ''))
+                limited = check_rate_limit(scope, request, emails)
+                if limited:
+                    return limited
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
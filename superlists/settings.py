@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'lists',
     'accounts',
     'functional_tests',
+    'benchmarks',
 ]
 
 AUTH_USER_MODEL = 'accounts.User'
@@ -52,6 +53,8 @@ AUTHENTICATION_BACKENDS = ['accounts.authentication.PasswordlessAuthenticationBa
 
 
 MIDDLEWARE = [
+    'superlists.metrics.MetricsMiddleware',
+    'superlists.db_routers.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,12 +88,100 @@ WSGI_APPLICATION = 'superlists.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/1.11/ref/settings/#databases
 
+# Several gunicorn workers write to one SQLite file. WAL lets readers carry on
+# while one connection writes, and writers queue on the busy timeout instead
+# of failing with "database is locked". synchronous=NORMAL is durable in WAL
+# mode except on power loss. Set SQLITE_LEGACY_JOURNAL to compare against
+# SQLite's defaults.
+if 'SQLITE_LEGACY_JOURNAL' in os.environ:
+    SQLITE_PRAGMAS = {'journal_mode': 'delete'}
+    SQLITE_BUSY_TIMEOUT = 5
+else:
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'cache_size': -32000,  # KiB
+        'temp_store': 'memory',
+    }
+    SQLITE_BUSY_TIMEOUT = 20
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'superlists.db_backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'timeout': SQLITE_BUSY_TIMEOUT,
+            'pragmas': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+
+# Comma separated paths of read-only copies of the primary database. Reads of
+# list data are spread across them; see superlists.db_routers.
+for n, path in enumerate(
+        filter(None, os.environ.get('DJANGO_DB_REPLICAS', '').split(','))):
+    DATABASES[f'replica{n}'] = dict(
+        DATABASES['default'], NAME=path, TEST={'MIRROR': 'default'})
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['superlists.db_routers.PrimaryReplicaRouter']
+
+# After a write, a client keeps reading from the primary for this long.
+REPLICA_PIN_SECONDS = 10
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'list-fragments',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'ratelimit': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ratelimit',
+    },
+}
+if not DEBUG:
+    # Shared by all gunicorn workers on the machine.
+    CACHES['ratelimit'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'RATE_LIMIT_CACHE_DIR', os.path.join(BASE_DIR, 'ratelimit_cache')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
     }
+
+# Searches by users with up to this many lists are narrowed to those lists
+# inside the full-text index; see lists.search.
+SEARCH_LIST_FILTER_MAX = 200
+
+# Rendered pieces of list.html are cached here, keyed by List.version.
+LIST_FRAGMENT_CACHE = 'fragments'
+
+# Token buckets for expensive POSTs, as (capacity, seconds to refill it
+# completely) per key kind: the client IP and the email the request is for.
+# A bulk share costs the IP one token per email it shares with.
+RATE_LIMIT_CACHE = 'ratelimit'
+RATE_LIMITS = {
+    'login_email': {'ip': (30, 10 * 60), 'email': (5, 60 * 60)},
+    'share': {'ip': (300, 60), 'email': (30, 60 * 60)},
 }
+# nginx passes the client address in X-Real-IP; gunicorn sits behind a unix
+# socket, so REMOTE_ADDR is empty there.
+RATE_LIMIT_CLIENT_IP_HEADER = None if DEBUG else 'HTTP_X_REAL_IP'
+
+# Seconds a login link stays valid; `manage.py purge_tokens` deletes the rest.
+LOGIN_TOKEN_MAX_AGE = 60 * 60
+
+# Emails of users known to exist, remembered per process so resolving the
+# logged-in user needs no query; 0 looks the user up on every request.
+AUTH_USER_CACHE_SIZE = 10000
+# Other workers only notice a deleted user once its entry expires.
+AUTH_USER_CACHE_TTL = 60
 
 
 # Password validation
@@ -131,6 +222,34 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+if not DEBUG:
+    # Content-hashed names plus .gz/.br siblings, served by nginx with
+    # far-future caching; needs collectstatic to have run.
+    STATICFILES_STORAGE = (
+        'superlists.storage.CompressedManifestStaticFilesStorage')
+
+# Items shown per page of a list; ?page_size= may ask for up to the maximum.
+LIST_PAGE_SIZE = 100
+LIST_MAX_PAGE_SIZE = 1000
+
+# Largest number of items accepted by one bulk add request.
+BULK_ITEMS_MAX = 1000
+
+# Live updates on list pages: browsers poll the changes feed every
+# LIST_LIVE_UPDATE_INTERVAL seconds. A request may wait up to
+# LIST_CHANGES_MAX_WAIT seconds for a change (long-polling), re-checking every
+# LIST_CHANGES_POLL_INTERVAL seconds; each waiting request holds a worker, so
+# only raise it when running threaded workers.
+LIST_LIVE_UPDATE_INTERVAL = 5
+LIST_CHANGES_MAX_WAIT = float(os.environ.get('LIST_CHANGES_MAX_WAIT', 0))
+LIST_CHANGES_POLL_INTERVAL = 0.5
+
+# Rows read per query when exporting a user's lists.
+EXPORT_BATCH_SIZE = 2000
+
+# Largest number of lists and of emails accepted by one bulk share request.
+BULK_SHARE_MAX_LISTS = 1000
+BULK_SHARE_MAX_EMAILS = 100
 
 LOGGING = {
     'version': 1,
@@ -149,9 +268,17 @@ LOGGING = {
     'root': {'level': 'INFO'},
 }
 
-EMAIL_HOST='smtp.gmail.com'
-EMAIL_HOST_USER = 'bingusdomingus@gmail.com'
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', 'bingusdomingus@gmail.com')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_PASSWORD')
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
+EMAIL_USE_TLS = 'EMAIL_NO_TLS' not in os.environ
+
+# Login emails are queued in accounts.OutgoingEmail and sent by
+# `manage.py send_outbox`; failures are retried after
+# OUTBOX_RETRY_DELAY * 2 ** (attempts - 1) seconds.
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_DELAY = 30
+OUTBOX_MAX_RETRY_DELAY = 3600
 
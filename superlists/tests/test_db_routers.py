@@ -0,0 +1,125 @@
+import io
+import os
+import sqlite3
+import tempfile
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TransactionTestCase, override_settings
+from accounts.models import Token
+from lists.models import Item, List
+from superlists.db_routers import PIN_COOKIE, PrimaryReplicaRouter, _state
+
+
+# TransactionTestCase, because TestCase's transaction would keep every
+# read on the primary.
+@override_settings(DATABASE_REPLICAS=['replica0', 'replica1'])
+class PrimaryReplicaRouterTest(TransactionTestCase):
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        _state.replica_reads = True
+        self.addCleanup(setattr, _state, 'replica_reads', False)
+        self.addCleanup(setattr, _state, 'replica', None)
+
+    def test_list_reads_go_to_replicas(self):
+        self.assertIn(self.router.db_for_read(List), ['replica0', 'replica1'])
+        self.assertIn(self.router.db_for_read(Item), ['replica0', 'replica1'])
+
+    def test_reads_stick_to_one_replica(self):
+        replica = self.router.db_for_read(List)
+        for _ in range(20):
+            self.assertEqual(self.router.db_for_read(Item), replica)
+
+    def test_related_reads_follow_the_instance(self):
+        list_ = List()
+        list_._state.db = 'replica1'
+        _state.replica = 'replica0'
+        self.assertEqual(
+            self.router.db_for_read(Item, instance=list_), 'replica1')
+
+    def test_account_reads_go_to_primary(self):
+        self.assertEqual(self.router.db_for_read(Token), 'default')
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(self.router.db_for_write(List), 'default')
+
+    def test_reads_outside_requests_go_to_primary(self):
+        _state.replica_reads = False
+        self.assertEqual(self.router.db_for_read(List), 'default')
+
+    def test_reads_in_a_transaction_go_to_primary(self):
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(List), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_everything_goes_to_primary_without_replicas(self):
+        self.assertEqual(self.router.db_for_read(List), 'default')
+
+    def test_only_primary_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate('default', 'lists'))
+        self.assertFalse(self.router.allow_migrate('replica0', 'lists'))
+
+
+class ReplicaReadsTest(TransactionTestCase):
+    """Uses a file copy of the test database as a lagging replica."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.replica_path = os.path.join(directory.name, 'replica.sqlite3')
+        settings.DATABASES['replica_test'] = dict(
+            connection.settings_dict, NAME=self.replica_path)
+        self.addCleanup(self.remove_replica)
+        self.list_ = List.create_new(first_item_text='replicated item')
+        self.copy_primary_to_replica()
+
+    def remove_replica(self):
+        connections['replica_test'].close()
+        del connections['replica_test']
+        del settings.DATABASES['replica_test']
+
+    def copy_primary_to_replica(self):
+        connection.ensure_connection()
+        # iterdump can't recreate FTS5 tables, which these tests don't use.
+        dump = [statement for statement in connection.connection.iterdump()
+                if 'lists_item_fts' not in statement]
+        replica = sqlite3.connect(self.replica_path)
+        replica.executescript('\n'.join(dump))
+        replica.close()
+
+    @override_settings(DATABASE_REPLICAS=['replica_test'])
+    def test_list_page_is_read_from_replica(self):
+        Item.objects.create(list=self.list_, text='not yet replicated')
+        response = self.client.get(f'/lists/{self.list_.id}/')
+        self.assertContains(response, 'replicated item')
+        self.assertNotContains(response, 'not yet replicated')
+
+    @override_settings(DATABASE_REPLICAS=['replica_test', 'default'])
+    def test_list_page_reads_from_a_single_database(self):
+        Item.objects.create(list=self.list_, text='not yet replicated')
+        for _ in range(10):
+            self.client.get(f'/lists/{self.list_.id}/')
+            self.assertIsNone(_state.replica)
+            data = self.client.get(f'/lists/{self.list_.id}/json').json()
+            self.assertEqual(data['item_count'], len(data['items']))
+
+    @override_settings(DATABASE_REPLICAS=['replica_test'])
+    def test_redirect_after_post_reads_own_write_from_primary(self):
+        response = self.client.post(
+            f'/lists/{self.list_.id}/', data={'text': 'just added'},
+            follow=True)
+        self.assertIn(PIN_COOKIE, self.client.cookies)
+        self.assertContains(response, 'just added')
+
+    @override_settings(DATABASE_REPLICAS=['replica_test'])
+    def test_commands_read_what_they_write_from_primary(self):
+        List.create_new(first_item_text='not yet replicated')
+        path = os.path.join(os.path.dirname(self.replica_path), 'lists.jsonl')
+        with open(path, 'w') as source:
+            source.write('{"list_id": 1, "text": "imported"}\n')
+        call_command('import_lists', path, stdout=io.StringIO())
+        call_command('repair_list_counters', stdout=io.StringIO())
+        self.list_.add_items(['added outside a request'])
+        self.assertEqual(List.objects.count(), 3)
+        self.assertEqual(List.objects.get(id=self.list_.id).item_count, 2)
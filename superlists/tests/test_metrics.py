@@ -0,0 +1,51 @@
+from django.test import TestCase
+from lists.models import List
+from superlists.metrics import Histogram, registry
+
+
+class HistogramTest(TestCase):
+
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram((1, 5))
+        for value in (0, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [1, 2])
+        self.assertEqual(histogram.count, 3)
+        self.assertEqual(histogram.sum, 13)
+
+
+class MetricsMiddlewareTest(TestCase):
+
+    def setUp(self):
+        registry.reset()
+
+    def test_records_request_per_url_name(self):
+        list_ = List.create_new(first_item_text='first')
+        self.client.get(f'/lists/{list_.id}/')
+        self.client.get(f'/lists/{list_.id}/')
+        self.client.get('/')
+        self.assertEqual(
+            registry.histograms['http_request_duration_seconds'][
+                'view_list'].count, 2)
+        self.assertEqual(
+            registry.histograms['http_request_duration_seconds'][
+                'home'].count, 1)
+
+    def test_counts_queries(self):
+        list_ = List.create_new(first_item_text='first')
+        self.client.get(f'/lists/{list_.id}/json')
+        queries = registry.histograms['http_request_db_queries']['list_json']
+        self.assertEqual(queries.sum, 5)
+
+    def test_records_response_size(self):
+        response = self.client.get('/')
+        sizes = registry.histograms['http_response_size_bytes']['home']
+        self.assertEqual(sizes.sum, len(response.content))
+
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        self.client.get('/')
+        response = self.client.get('/metrics')
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4')
+        self.assertContains(
+            response, 'http_request_duration_seconds_count{view="home"} 1')
+        self.assertContains(response, '# TYPE http_request_db_queries histogram')
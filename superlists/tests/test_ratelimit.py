@@ -0,0 +1,45 @@
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from superlists.ratelimit import TokenBucket, client_ip
+
+
+class TokenBucketTest(SimpleTestCase):
+
+    def setUp(self):
+        cache = caches['ratelimit']
+        cache.clear()
+        self.bucket = TokenBucket('test', capacity=3, period=60, cache=cache)
+
+    def test_allows_a_burst_up_to_capacity(self):
+        results = [self.bucket.consume('key', now=100) for _ in range(4)]
+        self.assertEqual(results[:3], [0, 0, 0])
+        self.assertEqual(results[3], 20)
+
+    def test_refills_over_time(self):
+        for _ in range(3):
+            self.bucket.consume('key', now=100)
+        self.assertEqual(self.bucket.consume('key', now=110), 10)
+        self.assertEqual(self.bucket.consume('key', now=120), 0)
+
+    def test_can_take_several_tokens_at_once(self):
+        self.assertEqual(self.bucket.consume('key', now=100, count=3), 0)
+        self.assertEqual(self.bucket.consume('key', now=100, count=2), 40)
+
+    def test_keys_have_separate_buckets(self):
+        for _ in range(3):
+            self.bucket.consume('key', now=100)
+        self.assertEqual(self.bucket.consume('other', now=100), 0)
+
+
+class ClientIPTest(SimpleTestCase):
+
+    def test_uses_remote_addr_by_default(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='1.2.3.4',
+                                       HTTP_X_REAL_IP='5.6.7.8')
+        self.assertEqual(client_ip(request), '1.2.3.4')
+
+    @override_settings(RATE_LIMIT_CLIENT_IP_HEADER='HTTP_X_REAL_IP')
+    def test_uses_proxy_header_when_configured(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='',
+                                       HTTP_X_REAL_IP='5.6.7.8')
+        self.assertEqual(client_ip(request), '5.6.7.8')
@@ -0,0 +1,47 @@
+import os
+import sqlite3
+import tempfile
+from django.db import connection
+from django.test import SimpleTestCase
+from superlists.db_backends.sqlite3.base import DatabaseWrapper
+
+
+class PragmaBackendTest(SimpleTestCase):
+
+    def connect(self, pragmas, **options):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_dict = dict(connection.settings_dict)
+        settings_dict['NAME'] = os.path.join(directory.name, 'test.sqlite3')
+        settings_dict['OPTIONS'] = dict(
+            options, timeout=7, pragmas=pragmas)
+        wrapper = DatabaseWrapper(settings_dict, alias='pragma_test')
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_applies_pragmas_to_new_connections(self):
+        wrapper = self.connect({'journal_mode': 'wal', 'synchronous': 'normal'})
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+
+    def test_passes_other_options_to_sqlite(self):
+        wrapper = self.connect({})
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 7000)
+
+    def test_transaction_mode_takes_write_lock_at_begin(self):
+        wrapper = self.connect({'journal_mode': 'wal'},
+                               transaction_mode='IMMEDIATE')
+        wrapper.ensure_connection()
+        other = sqlite3.connect(wrapper.settings_dict['NAME'], timeout=0)
+        self.addCleanup(other.close)
+
+        wrapper._start_transaction_under_autocommit()
+        with self.assertRaisesRegex(sqlite3.OperationalError, 'locked'):
+            other.execute('BEGIN IMMEDIATE')
+        wrapper.connection.rollback()
+        other.execute('BEGIN IMMEDIATE')
@@ -0,0 +1,57 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from django.core.management import call_command
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase, override_settings
+from superlists import storage
+
+
+class CompressedManifestStorageTest(SimpleTestCase):
+
+    # Collecting and compressing everything is slow, so do it once.
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.root = cls.directory.name
+        cls.storage_settings = override_settings(
+            STATIC_ROOT=cls.root,
+            STATICFILES_STORAGE=(
+                'superlists.storage.CompressedManifestStaticFilesStorage'))
+        cls.storage_settings.enable()
+        call_command('collectstatic', '--no-input', verbosity=0)
+        with open(os.path.join(cls.root, 'staticfiles.json')) as manifest:
+            cls.paths = json.load(manifest)['paths']
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.storage_settings.disable()
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def test_writes_hashed_names_to_the_manifest(self):
+        hashed = self.paths['list.js']
+        self.assertRegex(hashed, r'^list\.[0-9a-f]{12}\.js$')
+        self.assertTrue(os.path.exists(os.path.join(self.root, hashed)))
+
+    def test_writes_gzip_sibling_of_hashed_files(self):
+        hashed = os.path.join(self.root, self.paths['jquery-3.4.1.min.js'])
+        with open(hashed, 'rb') as original, \
+                gzip.open(hashed + '.gz') as compressed:
+            self.assertEqual(compressed.read(), original.read())
+
+    @unittest.skipIf(storage.brotli is None, 'brotli is not installed')
+    def test_writes_brotli_sibling_of_hashed_files(self):
+        hashed = os.path.join(self.root, self.paths['jquery-3.4.1.min.js'])
+        with open(hashed, 'rb') as original, \
+                open(hashed + '.br', 'rb') as compressed:
+            self.assertEqual(
+                storage.brotli.decompress(compressed.read()), original.read())
+
+    def test_templates_link_to_hashed_names(self):
+        html = render_to_string('home.html')
+        self.assertIn(f'/static/{self.paths["list.js"]}', html)
+        self.assertIn(f'/static/{self.paths["base.css"]}', html)
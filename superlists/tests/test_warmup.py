@@ -0,0 +1,24 @@
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from superlists import warmup
+
+
+class WarmUpTest(SimpleTestCase):
+
+    def test_runs_every_step_and_records_timings(self):
+        timings = warmup.warm_up()
+        self.assertEqual(list(timings), list(warmup.STEPS))
+        self.assertTrue(all(seconds >= 0 for seconds in timings.values()))
+
+    def test_loads_the_page_templates(self):
+        with patch('superlists.warmup.get_template') as get_template:
+            warmup.warm_up()
+        self.assertEqual(
+            [call[0][0] for call in get_template.call_args_list],
+            list(warmup.TEMPLATES))
+
+    def test_can_be_disabled_from_the_environment(self):
+        with patch.dict('os.environ', {'SUPERLISTS_WARM_UP': '0'}):
+            self.assertFalse(warmup.enabled())
+        with patch.dict('os.environ', {}, clear=True):
+            self.assertTrue(warmup.enabled())
@@ -17,11 +17,13 @@ from django.conf.urls import url, include
 from lists import views as list_views
 from lists import urls as list_urls
 from accounts import urls as account_urls
+from superlists import metrics
 
 
 urlpatterns = [
     url(r'^$', list_views.home_page, name='home'),
     url(r'^lists/', include(list_urls)),
     url(r'^accounts/', include(account_urls)),
+    url(r'^metrics$', metrics.metrics, name='metrics'),
 
 ]
@@ -0,0 +1,71 @@
+"""Build the lazily created pieces of the app before a worker serves its
+first request: the URL resolver, compiled templates, form widgets, the
+static files manifest and backends that middleware imports on first use.
+
+Called from superlists.wsgi, so it runs once per gunicorn worker, or once
+in the master when the app is preloaded."""
+import os
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.urlresolvers import get_resolver, reverse
+from django.template.loader import get_template
+from django.utils.module_loading import import_string
+
+TEMPLATES = ('base.html', 'home.html', 'list.html', 'my_lists.html',
+             'search.html')
+
+# Timings in seconds of the last warm_up() run, by step.
+timings = OrderedDict()
+
+
+def _urls():
+    # Requests look the resolver up by name, which is cached separately
+    # from get_resolver(None).
+    get_resolver(settings.ROOT_URLCONF).url_patterns
+    reverse('view_list', args=(1,), urlconf=settings.ROOT_URLCONF)
+
+
+def _templates():
+    for name in TEMPLATES:
+        get_template(name)
+
+
+def _forms():
+    from lists.forms import ExistingListItemForm, NewListForm
+    from lists.models import List
+    # Rendering a widget loads the form renderer's own template engine.
+    str(NewListForm()['text'])
+    str(ExistingListItemForm(for_list=List())['text'])
+
+
+def _static():
+    # Loads staticfiles.json when the manifest storage is in use.
+    staticfiles_storage.url('base.css')
+
+
+def _middleware_backends():
+    import_string(settings.MESSAGE_STORAGE)
+
+
+STEPS = OrderedDict([
+    ('urls', _urls),
+    ('templates', _templates),
+    ('forms', _forms),
+    ('static', _static),
+    ('middleware', _middleware_backends),
+])
+
+
+def enabled():
+    return os.environ.get('SUPERLISTS_WARM_UP', '1') != '0'
+
+
+def warm_up():
+    timings.clear()
+    for name, step in STEPS.items():
+        start = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - start
+    return timings
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "superlists.settings")
 
 application = get_wsgi_application()
+
+from superlists import warmup  # noqa: E402
+if warmup.enabled():
+    warmup.warm_up()